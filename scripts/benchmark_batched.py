@@ -0,0 +1,73 @@
+"""
+Measure real-time factor (processing time / audio duration) of sequential vs
+batched faster-whisper decoding on CPU over tests/labeled_audios.
+
+Each labeled file is tiled to --min-seconds so the batched pipeline has several
+VAD chunks to batch. Lower RTF is better.
+
+Usage: python scripts/benchmark_batched.py [--model tiny] [--batch-sizes 1 2 4 8 16]
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+import numpy as np
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
+
+FOLDER = Path('tests/labeled_audios')
+SAMPLE_RATE = 16000
+
+
+def load_audios(min_seconds):
+    audios = []
+    for path in sorted(FOLDER.glob('*.wav')):
+        audio = decode_audio(str(path), sampling_rate=SAMPLE_RATE)
+        # Pad each copy with a short pause so VAD sees separate utterances
+        pause = np.zeros(SAMPLE_RATE // 2, dtype=np.float32)
+        unit = np.concatenate([audio, pause])
+        reps = max(1, int(np.ceil(min_seconds * SAMPLE_RATE / len(unit))))
+        audios.append((path.name, np.tile(unit, reps)))
+    return audios
+
+
+def run(transcribe, audios, **kwargs):
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    for _, audio in audios:
+        segments, _ = transcribe(audio, vad_filter=True, **kwargs)
+        for _ in segments:
+            pass
+        audio_seconds += len(audio) / SAMPLE_RATE
+    return (time.perf_counter() - start) / audio_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='tiny')
+    parser.add_argument('--compute-type', default='int8')
+    parser.add_argument('--cpu-threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--min-seconds', type=float, default=120.0)
+    args = parser.parse_args()
+
+    audios = load_audios(args.min_seconds)
+    if not audios:
+        raise SystemExit(f"No WAV files found in {FOLDER}")
+    model = WhisperModel(args.model, device='cpu', compute_type=args.compute_type, cpu_threads=args.cpu_threads)
+    batched = BatchedInferencePipeline(model)
+    # Warm up so the first measurement does not pay for allocation
+    run(model.transcribe, [(audios[0][0], audios[0][1][:SAMPLE_RATE * 5])])
+
+    total = sum(len(audio) for _, audio in audios) / SAMPLE_RATE
+    print(f"{len(audios)} file(s), {total:.0f}s of audio, model={args.model}, cpu_threads={args.cpu_threads}")
+    sequential = run(model.transcribe, audios)
+    print(f"{'mode':<20}{'RTF':>10}{'speedup':>10}")
+    print(f"{'sequential':<20}{sequential:>10.3f}{1.0:>10.2f}")
+    for batch_size in args.batch_sizes:
+        rtf = run(batched.transcribe, audios, batch_size=batch_size)
+        print(f"{f'batched (bs={batch_size})':<20}{rtf:>10.3f}{sequential / rtf:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+History query cost on a large transcriptions table.
+
+Fills a database with --rows transcriptions (one million by default), then times:
+  - the old recent-N query (ORDER BY timestamp DESC on an unindexed column),
+  - get_recent_transcriptions (ORDER BY id DESC),
+  - deep pages fetched with LIMIT/OFFSET against get_transcriptions_before (keyset).
+The query plans are printed so the full-table sort ("USE TEMP B-TREE") is visible.
+
+Usage: python scripts/benchmark_history.py [--rows 1000000] [--limit 10]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from unittest.mock import MagicMock
+from whisperdesktop.storage.storage_manager import StorageManager
+
+OLD_RECENT = """
+    SELECT id, timestamp, text, segments_metadata, audio_path
+    FROM transcriptions NOT INDEXED
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+OFFSET_PAGE = """
+    SELECT id, timestamp, text, segments_metadata, audio_path
+    FROM transcriptions
+    ORDER BY id DESC
+    LIMIT ? OFFSET ?
+"""
+
+
+def fill(db_path, rows):
+    segments = json.dumps([{"id": 0, "start": 0.0, "end": 2.5, "text": " hello world"}])
+    start = datetime.datetime(2020, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO transcriptions (timestamp, text, segments_metadata, audio_path) VALUES (?, ?, ?, ?)",
+        ((
+            (start + datetime.timedelta(minutes=i)).isoformat(),
+            f"transcription number {i} hello world",
+            segments,
+            None
+        ) for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def plan(conn, sql, params):
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "history.db")
+        StorageManager(db_path=db_path, event_bus=MagicMock()).close()
+        print(f"Filling {args.rows} rows...")
+        fill(db_path, args.rows)
+        manager = StorageManager(db_path=db_path, event_bus=MagicMock())
+        with manager._get_connection() as conn:
+            print(f"old recent plan:  {plan(conn, OLD_RECENT, (args.limit,))}")
+            print(f"old recent-{args.limit}:    {timed(lambda: conn.execute(OLD_RECENT, (args.limit,)).fetchall()):9.3f} ms")
+        print(f"get_recent:       {timed(lambda: manager.get_recent_transcriptions(args.limit)):9.3f} ms")
+        for depth in (0.01, 0.5, 0.99):
+            offset = int(args.rows * depth)
+            cursor = args.rows - offset + 1
+            with manager._get_connection() as conn:
+                offset_ms = timed(lambda: conn.execute(OFFSET_PAGE, (args.limit, offset)).fetchall())
+            keyset_ms = timed(lambda: manager.get_transcriptions_before(cursor, args.limit))
+            print(f"page at {depth:>4.0%}:      offset {offset_ms:9.3f} ms   keyset {keyset_ms:9.3f} ms")
+        manager.close()
+
+
+if __name__ == '__main__':
+    main()
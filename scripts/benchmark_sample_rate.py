@@ -0,0 +1,89 @@
+"""
+Compare 44.1 kHz capture against 16 kHz capture for one minute of audio.
+
+Reports the bytes written per minute at each rate, the CPU time faster-whisper
+spends decoding/resampling each WAV before inference, and the CPU time of the
+recorder's streaming resampler for devices that cannot capture at 16 kHz.
+
+Usage: python scripts/benchmark_sample_rate.py [--seconds 60] [--repeat 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import wave
+import numpy as np
+from faster_whisper import decode_audio
+from whisperdesktop.utils.audio import StreamingResampler
+
+SOURCE = 'tests/labeled_audios/sample_001.wav'
+
+
+def load_source(seconds):
+    with wave.open(SOURCE, 'rb') as w:
+        rate = w.getframerate()
+        samples = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    reps = int(np.ceil(seconds * rate / len(samples)))
+    return np.tile(samples, reps)[:seconds * rate], rate
+
+
+def write_wav(path, samples, rate):
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(samples.tobytes())
+
+
+def cpu_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    source, source_rate = load_source(args.seconds)
+    # Build the 44.1 kHz "before" signal from the 16 kHz sample with the same resampler
+    hi_rate = 44100
+    samples_44k = np.frombuffer(StreamingResampler(source_rate, hi_rate).process(source.tobytes()), dtype=np.int16)
+    samples_16k = np.frombuffer(StreamingResampler(hi_rate, 16000).process(samples_44k.tobytes()), dtype=np.int16)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_44k = os.path.join(tmp, 'capture_44k.wav')
+        path_16k = os.path.join(tmp, 'capture_16k.wav')
+        write_wav(path_44k, samples_44k, hi_rate)
+        write_wav(path_16k, samples_16k, 16000)
+        size_44k = os.path.getsize(path_44k)
+        size_16k = os.path.getsize(path_16k)
+        decode_44k = cpu_time(lambda: decode_audio(path_44k), args.repeat)
+        decode_16k = cpu_time(lambda: decode_audio(path_16k), args.repeat)
+
+    chunk = 1024
+    def stream_resample():
+        resampler = StreamingResampler(hi_rate, 16000)
+        for i in range(0, len(samples_44k), chunk):
+            resampler.process(samples_44k[i:i + chunk].tobytes())
+    stream_cost = cpu_time(stream_resample, args.repeat)
+
+    per_minute = 60.0 / args.seconds
+    print(f"Audio length: {args.seconds}s (figures below are per minute of audio)")
+    print(f"{'':32}{'44.1 kHz':>12}{'16 kHz':>12}{'saved':>12}")
+    print(f"{'WAV bytes written':32}{size_44k * per_minute:>12,.0f}{size_16k * per_minute:>12,.0f}"
+          f"{(size_44k - size_16k) * per_minute:>12,.0f}")
+    print(f"{'Worker decode+resample CPU (s)':32}{decode_44k * per_minute:>12.3f}{decode_16k * per_minute:>12.3f}"
+          f"{(decode_44k - decode_16k) * per_minute:>12.3f}")
+    print(f"Recorder streaming resample CPU when the device lacks 16 kHz: {stream_cost * per_minute:.3f}s "
+          f"({chunk}-frame chunks)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure StorageManager throughput with the shared WAL connection against the
+previous behaviour of opening a fresh rollback-journal connection per call.
+
+Reports saves per second and the latency of the history query the UI runs
+(get_recent_transcriptions) and of get_transcription by id, plus the rate of
+durable (synchronous=FULL) saves one per transaction versus grouped by
+save_transcriptions_bulk, as the write-behind queue does.
+
+Usage: python scripts/benchmark_storage.py [--saves 2000] [--reads 2000]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from unittest.mock import MagicMock
+from whisperdesktop.storage.storage_manager import StorageManager
+
+SEGMENTS = [{"id": i + 1, "start": i * 2.0, "end": i * 2.0 + 1.8, "text": f" segment {i}"} for i in range(8)]
+TEXT = " ".join(segment["text"].strip() for segment in SEGMENTS)
+
+
+class ConnectPerCallStorageManager(StorageManager):
+    """StorageManager as it was: a new default-journal connection for every call."""
+    def _open_connection(self):
+        return None
+
+    def _get_connection(self):
+        return sqlite3.connect(self._db_path)
+
+    def close(self):
+        pass
+
+
+def bench_saves(manager, count):
+    start = time.perf_counter()
+    for i in range(count):
+        manager.save_transcription(TEXT, SEGMENTS, f"recordings/{i}.wav")
+    return count / (time.perf_counter() - start)
+
+
+def bench_reads(fn, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def bench_durable(tmpdir, count, group):
+    manager = StorageManager(db_path=os.path.join(tmpdir, f"durable-{group}.db"), event_bus=MagicMock())
+    results = [{"text": TEXT, "segments": SEGMENTS, "audio_path": f"recordings/{i}.wav"} for i in range(count)]
+    start = time.perf_counter()
+    for i in range(0, count, group):
+        manager.save_transcriptions_bulk(results[i:i + group], durable=True)
+    rate = count / (time.perf_counter() - start)
+    manager.close()
+    return rate
+
+
+def run(label, cls, args, tmpdir):
+    manager = cls(db_path=os.path.join(tmpdir, f"{label}.db"), event_bus=MagicMock())
+    saves_per_sec = bench_saves(manager, args.saves)
+    recent = bench_reads(lambda i: manager.get_recent_transcriptions(limit=10), args.reads)
+    by_id = bench_reads(lambda i: manager.get_transcription(i % args.saves + 1), args.reads)
+    manager.close()
+    print(f"{label:<18} saves/s {saves_per_sec:>9.0f}   "
+          f"recent p50 {recent[0]:.3f} ms p99 {recent[1]:.3f} ms   "
+          f"by id p50 {by_id[0]:.3f} ms p99 {by_id[1]:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--saves', type=int, default=2000)
+    parser.add_argument('--reads', type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        run("connect per call", ConnectPerCallStorageManager, args, tmpdir)
+        run("shared WAL", StorageManager, args, tmpdir)
+        for group in (1, 16, 64):
+            print(f"durable, {group:>2} per transaction: {bench_durable(tmpdir, args.saves, group):9.0f} saves/s")
+
+
+if __name__ == '__main__':
+    main()
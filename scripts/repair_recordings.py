@@ -0,0 +1,36 @@
+"""
+Repair the headers of recordings that were interrupted before the WAV was closed,
+e.g. by a crash or power loss. Only the chunk headers of each file are read, so
+this is fast even for long recordings.
+
+Usage: python scripts/repair_recordings.py [recordings_dir] [--dry-run]
+"""
+
+import argparse
+import os
+import wave
+from whisperdesktop.utils.audio import repair_wav
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recordings_dir', nargs='?', default='recordings')
+    parser.add_argument('--dry-run', action='store_true', help="only list the files that need repairing")
+    args = parser.parse_args()
+    repaired = failed = 0
+    for name in sorted(os.listdir(args.recordings_dir)):
+        if not name.lower().endswith('.wav'):
+            continue
+        path = os.path.join(args.recordings_dir, name)
+        try:
+            if repair_wav(path, dry_run=args.dry_run):
+                repaired += 1
+                print(f"{'needs repair' if args.dry_run else 'repaired'}: {path}")
+        except (wave.Error, OSError) as e:
+            failed += 1
+            print(f"unreadable: {path} ({e})")
+    print(f"{repaired} file(s) {'to repair' if args.dry_run else 'repaired'}, {failed} unreadable")
+
+
+if __name__ == '__main__':
+    main()
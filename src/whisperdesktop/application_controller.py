@@ -1,40 +1,108 @@
+import os
 from whisperdesktop.event_bus.event_bus import EventBus
-from whisperdesktop.recorder.recorder import Recorder
+from whisperdesktop.config.config_manager import ConfigurationManager
+from whisperdesktop.recorder.recorder import Recorder, RecordingMode
+from whisperdesktop.recorder.recovery import RecoveryScanner
 from whisperdesktop.storage.storage_manager import StorageManager
+from whisperdesktop.storage.job_queue import JobQueue
 from whisperdesktop.clipboard.clipboard_controller import ClipboardController
-from whisperdesktop.transcriber.transcriber_worker import TranscriberWorker
+from whisperdesktop.transcriber.worker_pool import TranscriberPool
 from PyQt5.QtWidgets import QApplication
 from whisperdesktop.ui.ui_controller import UIController
+from whisperdesktop.ui.result_dispatcher import ResultDispatcher, EventMarshaller
+from whisperdesktop.event_bus.process_bridge import EventBridge
 from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.metrics import Metrics, MetricsReporter
 
 class ApplicationController:
     def __init__(self):
         # Initialize EventBus first (singleton)
         self._event_bus = EventBus()
+        self._config = ConfigurationManager()
         # Initialize core modules
-        self._recorder = Recorder()
+        recorder_config = self._config.get_config('recorder')
+        # Recordings that are only transcribed and deleted stay WAV; kept ones are compressed as they are written
+        storage_config = self._config.get_config('storage')
+        audio_format = storage_config.get('audio_format', 'flac') if storage_config.get('keep_audio_files', False) else 'wav'
+        self._recorder = Recorder(
+            sample_rate=recorder_config.get('sample_rate', 16000),
+            channels=recorder_config.get('channels', 1),
+            streaming=recorder_config.get('streaming', False),
+            shared_memory=recorder_config.get('shared_memory', False),
+            shared_buffer_seconds=recorder_config.get('shared_buffer_seconds', 300),
+            ring_buffer_seconds=recorder_config.get('ring_buffer_seconds', 30),
+            checkpoint_seconds=recorder_config.get('checkpoint_seconds', 5),
+            vad_speech_threshold=recorder_config.get('vad_speech_threshold', 0.5),
+            vad_hangover_ms=recorder_config.get('vad_hangover_ms', 800),
+            preroll_ms=recorder_config.get('preroll_ms', 0),
+            audio_format=audio_format
+        )
+        # The record button starts a hands-free session when voice activation is the default mode
+        self._toggle_mode = RecordingMode.TOGGLE
+        if recorder_config.get('default_mode', 'toggle') == 'voice_activated':
+            self._toggle_mode = RecordingMode.VOICE_ACTIVATED
         self._storage_manager = StorageManager()
-        self._clipboard_controller = ClipboardController(auto_copy=True, auto_paste=False)
-        # TranscriberWorker integration
+        self._clipboard_controller = ClipboardController(
+            auto_copy=True, auto_paste=False,
+            copy_segments=self._config.get_config('clipboard').get('copy_segments', True)
+        )
+        # Transcriber pool integration
         transcription_queue = self._event_bus.get_queue('transcription')
         result_queue = self._event_bus.get_queue('result')
-        self._transcriber_worker = TranscriberWorker(
-            model_size="base",
-            device="cpu",
-            compute_type="int8",
-            vad_filter=True,
-            vad_threshold=2.0,
-            event_bus=self._event_bus,
+        transcriber_config = self._config.get_config('transcriber')
+        # Events published inside worker processes arrive here and are re-published
+        # on the Qt thread (the QApplication is created below, before the bridge starts)
+        self._event_bridge = EventBridge(deliver=self._publish_bridged_event)
+        # Queued jobs live in the transcriptions database so they survive restarts
+        self._job_queue = None
+        if transcriber_config.get('durable_queue', True):
+            self._job_queue = JobQueue(self._storage_manager.db_path,
+                                       max_attempts=transcriber_config.get('max_attempts', 3))
+        self._transcriber_pool = TranscriberPool(
+            num_workers=transcriber_config.get('num_workers', 0),
             transcription_queue=transcription_queue,
-            result_queue=result_queue
+            result_queue=result_queue,
+            job_queue=self._job_queue,
+            event_bridge=self._event_bridge.sender,
+            model_size=transcriber_config.get('model_size', 'base'),
+            device=transcriber_config.get('device', 'cpu'),
+            compute_type=transcriber_config.get('compute_type', 'int8'),
+            vad_filter=transcriber_config.get('vad_filter', True),
+            vad_threshold=transcriber_config.get('vad_threshold', 2.0),
+            use_batched=transcriber_config.get('use_batched', False),
+            batch_size=transcriber_config.get('batch_size', 8),
+            batched_min_duration=transcriber_config.get('batched_min_duration', 30.0),
+            parallel_chunks=transcriber_config.get('parallel_chunks', 0),
+            chunk_seconds=transcriber_config.get('chunk_seconds', 30.0),
+            chunked_min_duration=transcriber_config.get('chunked_min_duration', 60.0)
         )
-        self._transcriber_worker.start()
+        self._transcriber_pool.start()
         self._result_queue = result_queue
         # UI integration
         self._app = QApplication([])
-        self._ui_controller = UIController(event_bus=self._event_bus)
+        self._ui_controller = UIController(event_bus=self._event_bus, storage_manager=self._storage_manager)
+        self._event_marshaller = EventMarshaller(self._event_bus)
+        self._event_bridge.start()
+        # Results are pushed to the Qt thread as they arrive instead of being polled
+        self._result_dispatcher = ResultDispatcher(result_queue, self._on_result)
+        self._result_dispatcher.start()
         # Placeholders for future integration
         self._setup_event_handlers()
+        # Recordings orphaned by a previous crash are re-queued in the background
+        self._recovery_scanner = None
+        if storage_config.get('recover_recordings', True):
+            self._recovery_scanner = RecoveryScanner(
+                self._storage_manager, transcription_queue,
+                delay=storage_config.get('recovery_delay', 10.0),
+                job_queue=self._job_queue
+            )
+            self._recovery_scanner.start()
+        # Timings, counters and event dispatch stats go to the log periodically and at exit
+        self._metrics_reporter = MetricsReporter(
+            interval=self._config.get_config('diagnostics').get('metrics_log_interval', 0),
+            event_bus=self._event_bus
+        )
+        self._metrics_reporter.start()
 
     def _setup_event_handlers(self):
         # Subscribe to core recording events
@@ -43,6 +111,9 @@ class ApplicationController:
         self._event_bus.subscribe(EventType.STOP_RECORDING_REQUESTED, self._on_stop_recording_requested)
         self._event_bus.subscribe(EventType.TOGGLE_RECORDING_REQUESTED, self._on_toggle_recording_requested)
 
+    def _publish_bridged_event(self, event_type, payload):
+        self._event_marshaller.publish(event_type, payload)
+
     def _on_start_recording_requested(self, data):
         try:
             self._recorder.start_recording()
@@ -57,39 +128,47 @@ class ApplicationController:
 
     def _on_toggle_recording_requested(self, data):
         try:
-            self._recorder.toggle_recording()
+            self._recorder.toggle_recording(self._toggle_mode)
         except Exception as e:
             Logger().error(f"Error in toggle_recording: {e}")
 
-    def _check_result_queue(self):
-        # Poll the result queue for new transcription results (non-blocking)
+    def _on_result(self, result):
+        # Called on the Qt thread by the ResultDispatcher for every item on the result queue
+        if not result:
+            return
+        if "cold_start_seconds" in result:
+            Metrics().record("cold_start_to_first_transcript_s", result["cold_start_seconds"])
+        # Saved by the storage write-behind thread, grouped with other results that arrive
+        # close together. TRANSCRIPTION_COMPLETED comes from the worker over the event bridge
+        # and StorageManager publishes TRANSCRIPTION_SAVED, so nothing is published here.
+        self._storage_manager.enqueue_save(result, on_saved=self._on_result_saved)
+
+    def _on_result_saved(self, transcription_id, result):
+        # Runs on the storage writer thread once the row is durable (or the save failed).
+        # A silent recording transcribes to no text and is never saved: its job is done
+        # all the same, and its audio is deleted even when recordings are kept, since
+        # nothing would reference it and recovery would re-queue it.
+        silent = not (result.get("text") or "").strip()
+        job_id = result.get("job_id")
+        if job_id is not None and self._job_queue is not None:
+            try:
+                if transcription_id < 0 and not silent:
+                    self._job_queue.fail(job_id, "transcription could not be saved")
+                else:
+                    self._job_queue.complete(job_id)
+            except Exception as e:
+                Logger().error(f"Error updating job {job_id}: {e}")
+        audio_path = result.get("audio_path")
+        if (transcription_id < 0 and not silent) or not audio_path:
+            return
+        if not silent and self._config.get_config('storage').get('keep_audio_files', False):
+            return
         try:
-            while self._result_queue is not None and not self._result_queue.empty():
-                result = self._result_queue.get_nowait()
-                if result:
-                    # Save transcription to database
-                    transcription_id = self._storage_manager.save_transcription(
-                        text=result.get("text", ""),
-                        segments_metadata=result.get("segments", []),
-                        audio_path=result.get("audio_path")
-                    )
-                    # Delete audio file after successful save
-                    audio_path = result.get("audio_path")
-                    if transcription_id and audio_path:
-                        import os
-                        try:
-                            os.remove(audio_path)
-                        except Exception as e:
-                            Logger().error(f"Error deleting audio file {audio_path}: {e}")
-                    # Publish transcription completed event
-                    from whisperdesktop.event_bus.event_bus import EventType
-                    self._event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, {
-                        "id": transcription_id,
-                        "text": result.get("text", ""),
-                        "segments": result.get("segments", [])
-                    })
+            os.remove(audio_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            Logger().error(f"Error processing result queue: {e}")
+            Logger().error(f"Error deleting audio file {audio_path}: {e}")
 
     def run(self):
         # Show the UI and start the Qt event loop
@@ -104,12 +183,28 @@ class ApplicationController:
     def cleanup(self):
         # Properly release/terminate all resources
         try:
-            if hasattr(self, '_transcriber_worker') and self._transcriber_worker:
-                if self._transcriber_worker.is_alive():
-                    self._transcriber_worker.stop()
-                    self._transcriber_worker.join(timeout=1.0)
+            if hasattr(self, '_recovery_scanner') and self._recovery_scanner:
+                self._recovery_scanner.stop()
+            # Workers finish their current job first; the dispatcher then delivers every
+            # result they produced, and the storage write-behind saves them
+            if hasattr(self, '_transcriber_pool') and self._transcriber_pool:
+                self._transcriber_pool.shutdown(timeout=5.0)
+            if hasattr(self, '_result_dispatcher') and self._result_dispatcher:
+                self._result_dispatcher.stop()
+            if hasattr(self, '_storage_manager') and self._storage_manager:
+                self._storage_manager.flush()
+            if hasattr(self, '_event_bridge') and self._event_bridge:
+                self._event_bridge.stop()
             if hasattr(self, '_recorder') and self._recorder:
                 self._recorder.cleanup()
+            if hasattr(self, '_storage_manager') and self._storage_manager:
+                self._storage_manager.close()
+            # After the storage write-behind has drained, which completes the saved jobs
+            if hasattr(self, '_job_queue') and self._job_queue:
+                self._job_queue.close()
+            if hasattr(self, '_metrics_reporter') and self._metrics_reporter:
+                self._metrics_reporter.stop()
+            self._event_bus.shutdown()
             # Add additional cleanup for other modules as needed
         except Exception as e:
             Logger().error(f"Error during cleanup: {e}") 
\ No newline at end of file
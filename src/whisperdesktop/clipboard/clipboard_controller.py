@@ -7,16 +7,41 @@ class ClipboardController:
     """
     Handles clipboard operations and optional paste simulation.
     """
-    def __init__(self, auto_copy=True, auto_paste=False):
+    def __init__(self, auto_copy=True, auto_paste=False, copy_segments=True):
         self.auto_copy = auto_copy
         self.auto_paste = auto_paste
+        # Copy the text decoded so far as each segment arrives, not only the final text
+        self.copy_segments = copy_segments
+        # Segment texts of transcriptions in progress, by audio path
+        self._segments = {}
         self.event_bus = EventBus()
         self._setup_event_handlers()
 
     def _setup_event_handlers(self):
-        self.event_bus.subscribe(EventType.TRANSCRIPTION_COMPLETED, self._on_transcription_completed)
+        # Clipboard access and paste simulation can be slow; keep them off the publisher's thread.
+        # Both events go to one callback so they share a delivery thread and stay in order:
+        # a late segment can never overwrite the final text.
+        self.event_bus.subscribe(EventType.TRANSCRIPTION_SEGMENT, self._on_transcription_event, asynchronous=True)
+        self.event_bus.subscribe(EventType.TRANSCRIPTION_COMPLETED, self._on_transcription_event, asynchronous=True)
+
+    def _on_transcription_event(self, data):
+        if not data:
+            return
+        # Segment payloads carry their time range; completed payloads do not
+        if "start" in data:
+            self._on_transcription_segment(data)
+        else:
+            self._on_transcription_completed(data)
+
+    def _on_transcription_segment(self, data):
+        if not (self.auto_copy and self.copy_segments):
+            return
+        parts = self._segments.setdefault(data.get("audio_path"), [])
+        parts.append(data.get("text", ""))
+        self.copy_to_clipboard("".join(parts).strip())
 
     def _on_transcription_completed(self, data):
+        self._segments.pop(data.get("audio_path"), None)
         if self.auto_copy and "text" in data:
             self.copy_to_clipboard(data["text"])
             if self.auto_paste:
@@ -24,12 +24,27 @@ class ConfigurationManager:
                 "vad_filter": True,
                 "vad_threshold": 2.0,
                 "use_batched": False,
-                "batch_size": 8
+                "batch_size": 8,
+                "batched_min_duration": 30.0,  # seconds; shorter recordings decode sequentially
+                "parallel_chunks": 0,  # threads per worker decoding chunks of one long recording; 0 = off
+                "chunk_seconds": 30.0,  # target chunk length, cut at pauses
+                "chunked_min_duration": 60.0,  # seconds; shorter recordings are not chunked
+                "num_workers": 0,  # worker processes; 0 sizes the pool to the machine's cores
+                "durable_queue": True,  # keep queued jobs in the database across restarts
+                "max_attempts": 3  # per job, with exponential backoff between attempts
             },
             "recorder": {
-                "sample_rate": 44100,
+                "sample_rate": 16000,  # Whisper's native rate; resampled once if the device can't capture it
                 "channels": 1,
-                "default_mode": "toggle"  # or "push_to_talk"
+                "default_mode": "toggle",  # or "push_to_talk", "voice_activated"
+                "vad_speech_threshold": 0.5,  # Silero speech probability for voice-activated recording
+                "vad_hangover_ms": 800,  # silence that ends a voice-activated segment
+                "streaming": False,  # send audio to the transcriber while recording
+                "shared_memory": False,  # hand PCM to the transcriber in memory instead of via the WAV
+                "shared_buffer_seconds": 300,
+                "ring_buffer_seconds": 30,  # audio held between the capture callback and the writer thread
+                "checkpoint_seconds": 5,  # how often the WAV is synced to disk; bounds what a crash loses
+                "preroll_ms": 0  # >0 keeps the microphone open and starts recordings with this much earlier audio
             },
             "ui": {
                 "theme": "dark",
@@ -38,11 +53,18 @@ class ConfigurationManager:
             },
             "clipboard": {
                 "auto_copy": True,
-                "auto_paste": False
+                "auto_paste": False,
+                "copy_segments": True  # update the clipboard as each segment is decoded
             },
             "storage": {
                 "db_path": "transcriptions.db",
-                "keep_audio_files": False
+                "keep_audio_files": False,
+                "audio_format": "flac",  # kept recordings: "flac", "opus" or "wav"
+                "recover_recordings": True,  # re-transcribe recordings left over from a crash
+                "recovery_delay": 10.0  # seconds after startup before the recovery scan runs
+            },
+            "diagnostics": {
+                "metrics_log_interval": 0  # seconds between metrics reports in the log; 0 = only at exit
             }
         }
         self._config = self._default_config.copy() 
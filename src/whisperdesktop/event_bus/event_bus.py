@@ -5,9 +5,11 @@ EventBus module for inter-module communication using the Singleton pattern.
 """
 
 import logging
+import queue
+import time
 from enum import Enum
 from multiprocessing import Queue
-from typing import Callable, Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 import threading
 from whisperdesktop.utils.logger import Logger
 
@@ -20,6 +22,12 @@ class EventType(Enum):
     TRANSCRIPTION_COMPLETED = 4
     CONFIG_CHANGED = 5
     CONFIG_RESET = 6
+    TRANSCRIPTION_PARTIAL = 7
+    MODEL_READY = 8
+    TRANSCRIPTION_SAVED = 9
+    TRANSCRIPTION_DELETED = 10
+    # One decoded segment of a file transcription, published as soon as it is decoded
+    TRANSCRIPTION_SEGMENT = 11
     # Add more event types as needed
 
 class ResultQueue:
@@ -33,6 +41,42 @@ class ResultQueue:
     def empty(self):
         return self._queue.empty()
 
+class _SubscriberExecutor:
+    """
+    Delivers events to one asynchronous subscriber from its own thread, in publish order,
+    so a slow subscriber never blocks the publisher or other subscribers.
+    """
+    def __init__(self, callback: Callable[[Any], None], on_done: Callable[[EventType, float], None]):
+        self.callback = callback
+        self.refcount = 0
+        self._on_done = on_done
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"event-subscriber-{getattr(callback, '__name__', 'callback')}", daemon=True)
+        self._thread.start()
+
+    def submit(self, event_type: EventType, payload: Any, published_at: float):
+        self._queue.put((event_type, payload, published_at))
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            event_type, payload, published_at = item
+            try:
+                self.callback(payload)
+            except Exception as e:
+                logger.error(f"Error in async subscriber for {event_type}: {e}")
+            self._on_done(event_type, time.perf_counter() - published_at)
+
+    def stop(self, timeout: Optional[float] = 1.0):
+        self._queue.put(None)
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
 class EventBus:
     _instance = None
     _lock = threading.Lock()
@@ -45,11 +89,16 @@ class EventBus:
             return cls._instance
 
     def _initialize(self):
-        self._subscribers: Dict[EventType, List[Callable[[Any], None]]] = {event_type: [] for event_type in EventType}
+        # Each entry is (callback, executor); executor is None for synchronous subscribers
+        self._subscribers: Dict[EventType, List[tuple]] = {event_type: [] for event_type in EventType}
+        self._executors: Dict[Callable[[Any], None], _SubscriberExecutor] = {}
         self._queues: Dict[str, Queue] = {}
         self._queues['transcription'] = Queue()
         self._queues['result'] = Queue()
         self._event_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[EventType, Dict[str, float]] = {}
+        self._forwarder: Optional[Callable[[EventType, Any], None]] = None
 
     def get_queue(self, name: str) -> Queue:
         q = self._queues.get(name)
@@ -58,30 +107,126 @@ class EventBus:
         return q
 
     def publish(self, event_type: EventType, payload: Any = None):
+        # Snapshot the subscriber list and release the lock before calling anyone, so
+        # callbacks can (un)subscribe or publish and other publishers are never blocked
         with self._event_lock:
+            subscribers = list(self._subscribers[event_type])
+        start = time.perf_counter()
+        pending = 0
+        for callback, executor in subscribers:
+            if executor is not None:
+                executor.submit(event_type, payload, start)
+                pending += 1
+                continue
             try:
-                for callback in self._subscribers[event_type]:
-                    callback(payload)
-                logger.info(f"Published event: {event_type} with payload: {payload}")
+                callback(payload)
             except Exception as e:
                 logger.error(f"Error publishing event {event_type}: {e}")
+        forwarder = self._forwarder
+        if forwarder is not None:
+            try:
+                forwarder(event_type, payload)
+            except Exception as e:
+                logger.error(f"Error forwarding event {event_type}: {e}")
+        self._record_publish(event_type, time.perf_counter() - start, pending)
+        logger.debug(f"Published event: {event_type} to {len(subscribers)} subscriber(s)")
 
-    def subscribe(self, event_type: EventType, callback: Callable[[Any], None]):
+    def subscribe(self, event_type: EventType, callback: Callable[[Any], None], asynchronous: bool = False):
+        """
+        Register `callback` for `event_type`. Asynchronous subscribers are called from a
+        dedicated thread (one per callback) instead of the publisher's thread.
+        """
         with self._event_lock:
             try:
-                self._subscribers[event_type].append(callback)
+                executor = None
+                if asynchronous:
+                    executor = self._executors.get(callback)
+                    if executor is None:
+                        executor = _SubscriberExecutor(callback, self._record_async_delivery)
+                        self._executors[callback] = executor
+                    executor.refcount += 1
+                self._subscribers[event_type].append((callback, executor))
                 logger.info(f"Subscribed callback to event: {event_type}")
             except Exception as e:
                 logger.error(f"Error subscribing to event {event_type}: {e}")
 
     def unsubscribe(self, event_type: EventType, callback: Callable[[Any], None]):
+        executor_to_stop = None
         with self._event_lock:
             try:
-                if callback in self._subscribers[event_type]:
-                    self._subscribers[event_type].remove(callback)
-                    logger.info(f"Unsubscribed callback from event: {event_type}")
+                for entry in self._subscribers[event_type]:
+                    if entry[0] == callback:
+                        self._subscribers[event_type].remove(entry)
+                        executor = entry[1]
+                        if executor is not None:
+                            executor.refcount -= 1
+                            if executor.refcount == 0:
+                                del self._executors[callback]
+                                executor_to_stop = executor
+                        logger.info(f"Unsubscribed callback from event: {event_type}")
+                        break
             except Exception as e:
                 logger.error(f"Error unsubscribing from event {event_type}: {e}")
+        if executor_to_stop is not None:
+            executor_to_stop.stop()
+
+    def forward_to(self, forwarder: Callable[[EventType, Any], None]):
+        """
+        Send every event published in this process to `forwarder(event_type, payload)`,
+        e.g. a BridgeSender in a worker process. Subscribers inherited from the parent
+        process (fork start method) are dropped, since they belong to the main process.
+        """
+        with self._event_lock:
+            self._subscribers = {event_type: [] for event_type in EventType}
+            self._executors = {}
+            self._forwarder = forwarder
+
+    def _stats_for(self, event_type: EventType) -> Dict[str, float]:
+        stats = self._stats.get(event_type)
+        if stats is None:
+            stats = {
+                "published": 0, "publish_time_total": 0.0, "publish_time_max": 0.0,
+                "delivered_async": 0, "async_latency_total": 0.0, "async_latency_max": 0.0,
+                "queue_depth": 0, "queue_depth_max": 0
+            }
+            self._stats[event_type] = stats
+        return stats
+
+    def _record_publish(self, event_type: EventType, elapsed: float, pending: int):
+        with self._stats_lock:
+            stats = self._stats_for(event_type)
+            stats["published"] += 1
+            stats["publish_time_total"] += elapsed
+            stats["publish_time_max"] = max(stats["publish_time_max"], elapsed)
+            stats["queue_depth"] += pending
+            stats["queue_depth_max"] = max(stats["queue_depth_max"], stats["queue_depth"])
+
+    def _record_async_delivery(self, event_type: EventType, latency: float):
+        with self._stats_lock:
+            stats = self._stats_for(event_type)
+            stats["delivered_async"] += 1
+            stats["async_latency_total"] += latency
+            stats["async_latency_max"] = max(stats["async_latency_max"], latency)
+            stats["queue_depth"] -= 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-event-type dispatch counters. Times are in seconds: publish_time is spent in
+        the publisher's thread, async_latency is publish-to-callback-completion for
+        asynchronous subscribers, and queue_depth counts deliveries still pending.
+        """
+        with self._stats_lock:
+            return {event_type.name: dict(stats) for event_type, stats in self._stats.items()}
+
+    def shutdown(self):
+        """Stop the threads of all asynchronous subscribers."""
+        with self._event_lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+            for event_type in self._subscribers:
+                self._subscribers[event_type] = [entry for entry in self._subscribers[event_type] if entry[1] is None]
+        for executor in executors:
+            executor.stop()
 
     def add_queue(self, name: str):
         with self._event_lock:
@@ -0,0 +1,157 @@
+# src/event_bus/process_bridge.py
+"""
+Cross-process EventBus bridge: events published inside worker processes are sent
+over one pipe in compact batches and re-published in the main process.
+"""
+
+import multiprocessing
+import pickle
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from whisperdesktop.event_bus.event_bus import EventBus, EventType
+from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.metrics import Metrics
+
+# High-frequency progress events: within one batch only the latest payload per
+# recording is kept, so IPC volume is bounded by the flush rate, not the event rate
+COALESCED_EVENTS = frozenset({EventType.TRANSCRIPTION_PARTIAL})
+
+
+def _coalesce_key(payload: Any):
+    return payload.get("audio_path") if isinstance(payload, dict) else None
+
+
+class BridgeSender:
+    """
+    Worker-process end of the bridge. Picklable, so it can be handed to a
+    multiprocessing.Process; call start() inside the child before sending.
+    Events are buffered and flushed as one pickled list of (event id, payload)
+    after `flush_interval` seconds or once `max_batch` events are waiting.
+    """
+    def __init__(self, conn, lock, flush_interval: float = 0.02, max_batch: int = 64):
+        self._conn = conn
+        self._lock = lock
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._reset_runtime_state()
+
+    def _reset_runtime_state(self):
+        self._pending: List[Tuple[int, Any]] = []
+        self._coalesce_index: Dict[tuple, int] = {}
+        self._cond: Optional[threading.Condition] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __getstate__(self):
+        return {
+            "_conn": self._conn,
+            "_lock": self._lock,
+            "_flush_interval": self._flush_interval,
+            "_max_batch": self._max_batch
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_runtime_state()
+
+    def start(self):
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="event-bridge-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, event_type: EventType, payload: Any = None):
+        if self._cond is None:
+            # Not started (e.g. in the main process): write through without batching
+            self.write([(event_type.value, payload)])
+            return
+        with self._cond:
+            if event_type in COALESCED_EVENTS:
+                key = (event_type.value, _coalesce_key(payload))
+                index = self._coalesce_index.get(key)
+                if index is not None:
+                    self._pending[index] = (event_type.value, payload)
+                    return
+                self._coalesce_index[key] = len(self._pending)
+            self._pending.append((event_type.value, payload))
+            if len(self._pending) == 1 or len(self._pending) >= self._max_batch:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._closed and len(self._pending) < self._max_batch:
+                    # Give closely spaced events a moment to join this batch
+                    self._cond.wait_for(lambda: self._closed or len(self._pending) >= self._max_batch,
+                                        timeout=self._flush_interval)
+                batch, self._pending = self._pending, []
+                self._coalesce_index = {}
+                closed = self._closed
+            if batch:
+                self.write(batch)
+            if closed:
+                break
+
+    def write(self, batch: Optional[List[Tuple[int, Any]]]):
+        data = pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            # Several worker processes share the pipe; keep each message contiguous
+            with self._lock:
+                self._conn.send_bytes(data)
+        except (OSError, EOFError) as e:
+            Logger().error(f"Event bridge send failed: {e}")
+
+    def close(self, timeout: float = 1.0):
+        """Flush pending events and stop the sender thread."""
+        if self._cond is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=timeout)
+
+
+class EventBridge:
+    """
+    Main-process end of the bridge. A receiver thread reads batches from the pipe
+    and hands each event to `deliver(event_type, payload)`, which defaults to
+    publishing on this process's EventBus.
+    """
+    def __init__(self, deliver: Optional[Callable[[EventType, Any], None]] = None,
+                 flush_interval: float = 0.02, max_batch: int = 64):
+        self._recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+        self._sender = BridgeSender(send_conn, multiprocessing.Lock(), flush_interval, max_batch)
+        self._deliver = deliver if deliver is not None else EventBus().publish
+        self._thread = threading.Thread(target=self._run, name="event-bridge-receiver", daemon=True)
+
+    @property
+    def sender(self) -> BridgeSender:
+        return self._sender
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        metrics = Metrics()
+        while True:
+            try:
+                batch = pickle.loads(self._recv_conn.recv_bytes())
+            except (EOFError, OSError):
+                break
+            except Exception as e:
+                Logger().error(f"Event bridge received a malformed batch: {e}")
+                continue
+            if batch is None:
+                # Shutdown sentinel
+                break
+            metrics.record("event_bridge_batch_size", len(batch))
+            for event_id, payload in batch:
+                try:
+                    self._deliver(EventType(event_id), payload)
+                except Exception as e:
+                    Logger().error(f"Error re-publishing bridged event {event_id}: {e}")
+
+    def stop(self, timeout: float = 1.0):
+        self._sender.write(None)
+        self._thread.join(timeout=timeout)
+        self._recv_conn.close()
@@ -0,0 +1,62 @@
+# src/recorder/audio_encoder.py
+"""
+Compressed formats for recordings that are kept on disk, encoded incrementally with
+PyAV (the decoder faster-whisper already uses) as the recorder writes them.
+"""
+
+import av
+import numpy as np
+
+# Recording format -> (file extension, container format, codec)
+AUDIO_FORMATS = {
+    "flac": (".flac", "flac", "flac"),
+    "opus": (".opus", "ogg", "libopus"),
+}
+# Plenty for speech at 16 kHz
+OPUS_BIT_RATE = 24000
+
+
+class StreamingEncoder:
+    """
+    Encodes int16 PCM into a FLAC or Ogg Opus file block by block. It has the
+    writeframes()/close() interface of a wave writer, so the recorder can use either.
+    Both formats can be decoded from any prefix of the file, so a recording cut short
+    by a crash is still usable.
+    """
+    def __init__(self, fileobj, audio_format: str, sample_rate: int, channels: int = 1):
+        """
+        Args:
+            fileobj: Binary file object to write to; left open by close()
+            audio_format (str): A key of AUDIO_FORMATS
+            sample_rate (int): Rate of the PCM passed to writeframes()
+            channels (int): Interleaved channels in the PCM
+        """
+        _, container_format, codec = AUDIO_FORMATS[audio_format]
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._container = av.open(fileobj, 'w', format=container_format)
+        self._stream = self._container.add_stream(codec, rate=sample_rate)
+        self._stream.layout = 'mono' if channels == 1 else 'stereo'
+        if codec == 'libopus':
+            self._stream.bit_rate = OPUS_BIT_RATE
+        self._pts = 0
+
+    def writeframes(self, data):
+        samples = np.frombuffer(data, dtype=np.int16)
+        if not len(samples):
+            return
+        # Packed s16 takes one plane of interleaved samples
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format='s16', layout=self._stream.layout.name)
+        frame.sample_rate = self._sample_rate
+        frame.pts = self._pts
+        self._pts += len(samples) // self._channels
+        for packet in self._stream.encode(frame):
+            self._container.mux(packet)
+
+    def close(self):
+        if self._container is None:
+            return
+        for packet in self._stream.encode(None):
+            self._container.mux(packet)
+        self._container.close()
+        self._container = None
@@ -0,0 +1,92 @@
+# src/recorder/capture_buffer.py
+"""
+Pre-allocated single-producer/single-consumer byte ring used between the PortAudio
+callback and the recorder's writer thread.
+"""
+
+
+class CaptureRingBuffer:
+    """
+    Fixed-size ring of raw PCM bytes. One thread writes (the audio callback), one thread
+    reads (the writer). Neither takes a lock: each side only advances its own position,
+    and a position is published after the bytes it covers have been copied, which is
+    safe under the GIL. When the reader falls behind far enough for the ring to fill
+    up, new audio is dropped and counted rather than blocking the callback.
+    """
+    def __init__(self, capacity: int, align: int = 1):
+        """
+        Args:
+            capacity (int): Size in bytes; rounded down to a multiple of `align`
+            align (int): Bytes per audio frame; reads and writes never split a frame
+        """
+        capacity -= capacity % align
+        if capacity <= 0:
+            raise ValueError("capacity must hold at least one frame")
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._capacity = capacity
+        self._align = align
+        # Total bytes ever written / read; only the producer / consumer updates each
+        self._written = 0
+        self._read = 0
+        self.dropped_bytes = 0
+        self.high_water = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def bytes_written(self) -> int:
+        """Total bytes stored since creation; marks a position in the audio stream."""
+        return self._written
+
+    @property
+    def bytes_read(self) -> int:
+        return self._read
+
+    def available(self) -> int:
+        """Bytes waiting to be read."""
+        return self._written - self._read
+
+    def write(self, data) -> int:
+        """
+        Copy `data` into the ring. Called from the audio callback, so it never blocks or
+        allocates beyond the slice views.
+        Returns:
+            int: Bytes stored; the rest of `data` was dropped because the ring was full
+        """
+        size = len(data)
+        free = self._capacity - (self._written - self._read)
+        if size > free:
+            stored = free - free % self._align
+            self.dropped_bytes += size - stored
+            size = stored
+        if size:
+            start = self._written % self._capacity
+            first = min(size, self._capacity - start)
+            source = memoryview(data)
+            self._view[start:start + first] = source[:first]
+            if first < size:
+                self._view[:size - first] = source[first:size]
+            self._written += size
+        level = self._written - self._read
+        if level > self.high_water:
+            self.high_water = level
+        return size
+
+    def read(self, max_bytes: int = None) -> bytes:
+        """Remove and return up to `max_bytes` (default: everything available), whole frames only."""
+        size = self._written - self._read
+        if max_bytes is not None:
+            size = min(size, max_bytes)
+        size -= size % self._align
+        if not size:
+            return b''
+        start = self._read % self._capacity
+        first = min(size, self._capacity - start)
+        data = bytes(self._view[start:start + first])
+        if first < size:
+            data += bytes(self._view[:size - first])
+        self._read += size
+        return data
@@ -7,19 +7,42 @@ from enum import Enum
 import pyaudio
 import wave
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Optional
 from whisperdesktop.event_bus.event_bus import EventBus, EventType
+from whisperdesktop.transcriber.streaming import STREAM_START, STREAM_CHUNK, STREAM_END
+from whisperdesktop.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+from whisperdesktop.recorder.capture_buffer import CaptureRingBuffer
+from whisperdesktop.recorder.audio_encoder import AUDIO_FORMATS, StreamingEncoder
+from whisperdesktop.recorder.voice_activity import VoiceActivityDetector, SpeechSegmenter, SEGMENT_OPEN, SEGMENT_AUDIO
+from whisperdesktop.utils.audio import StreamingResampler, WHISPER_SAMPLE_RATE
 from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.metrics import Metrics
 
 logger = Logger()
 
+# Where recordings are written, relative to the working directory
+RECORDINGS_DIR = 'recordings'
+# Extensions of the files the Recorder can write
+RECORDING_EXTENSIONS = ('.wav',) + tuple(extension for extension, _, _ in AUDIO_FORMATS.values())
+
 class RecordingMode(Enum):
     PUSH_TO_TALK = 1
     TOGGLE = 2
+    # Hands-free: capture runs until stopped, and each stretch of speech is written to
+    # its own file and queued for transcription as soon as it ends
+    VOICE_ACTIVATED = 3
 
 class Recorder:
-    def __init__(self, sample_rate=44100, channels=1, chunk_size=1024, format=pyaudio.paInt16):
+    # How often the writer thread drains the capture ring buffer
+    WRITER_POLL_INTERVAL = 0.02
+
+    def __init__(self, sample_rate=WHISPER_SAMPLE_RATE, channels=1, chunk_size=1024, format=pyaudio.paInt16, streaming=False,
+                 shared_memory=False, shared_buffer_seconds=300, ring_buffer_seconds=30, wav_block_seconds=1.0,
+                 checkpoint_seconds=5.0, vad_speech_threshold=0.5, vad_hangover_ms=800, preroll_ms=0,
+                 audio_format='wav'):
         self._sample_rate = sample_rate
         self._channels = channels
         self._chunk_size = chunk_size
@@ -30,8 +53,55 @@ class Recorder:
         self._file_path = None
         self._event_bus = EventBus()
         self._mode = RecordingMode.TOGGLE
-        self._wave_file = None
+        # A wave writer, or a StreamingEncoder when recordings are kept as FLAC/Opus
+        self._audio_file = None
+        self._audio_fileobj = None
+        self._audio_format = audio_format
+        # How often the WAV is synced to disk, bounding what a crash can lose
+        self._checkpoint_seconds = checkpoint_seconds
         self._logger = Logger()
+        # Rate the device is opened at; differs from _sample_rate only when the
+        # device cannot capture at the target rate and chunks are resampled
+        self._capture_rate = sample_rate
+        self._resampler = None
+        # When streaming, PCM chunks are sent to the transcriber while recording
+        self._streaming = streaming
+        self._transcription_queue = None
+        # With shared memory, frames reach the worker through a ring buffer and the
+        # WAV is only a crash-safe copy written by a background thread
+        self._shared_buffer = None
+        self._segment_start = 0
+        # The audio callback only copies into a pre-allocated ring buffer; a writer thread
+        # resamples, feeds the transcriber and writes the WAV in blocks of wav_block_seconds
+        self._ring_buffer_seconds = ring_buffer_seconds
+        self._wav_block_seconds = wav_block_seconds
+        self._ring = None
+        self._writer = None
+        self._writer_stop = threading.Event()
+        # Position in the ring buffer where the current recording ends
+        self._stop_mark = None
+        self._xruns = 0
+        self._dropped_baseline = 0
+        # Voice-activated sessions: speech detection runs on the writer thread
+        self._vad_detector = VoiceActivityDetector(speech_threshold=vad_speech_threshold)
+        self._vad_hangover_ms = vad_hangover_ms
+        self._segmenter = None
+        self._session_timestamp = None
+        self._segment_index = 0
+        # Pre-roll: the input stream stays open between recordings and the last preroll_ms
+        # of audio is kept, so a recording starts with audio from before it was requested
+        self._preroll_ms = preroll_ms
+        self._preroll_thread = None
+        self._preroll_audio = bytearray()
+        if shared_memory:
+            try:
+                self._shared_buffer = SharedPCMRingBuffer.create(
+                    int(sample_rate * shared_buffer_seconds), channels, sample_rate
+                )
+            except Exception as e:
+                self._logger.error(f"Shared memory unavailable, using WAV hand-off: {e}")
+        if preroll_ms > 0:
+            self._start_preroll()
 
     # Implementation of methods will follow in subsequent subtasks. 
 
@@ -42,65 +112,341 @@ class Recorder:
         try:
             self._mode = mode
             self._recording = True
-            os.makedirs('recordings', exist_ok=True)
-            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-            self._file_path = f'recordings/recording_{timestamp}.wav'
-            self._wave_file = wave.open(self._file_path, 'wb')
-            self._wave_file.setnchannels(self._channels)
-            self._wave_file.setsampwidth(self._audio.get_sample_size(self._format))
-            self._wave_file.setframerate(self._sample_rate)
-            self._stream = self._audio.open(
-                format=self._format,
-                channels=self._channels,
-                rate=self._sample_rate,
-                input=True,
-                frames_per_buffer=self._chunk_size,
-                stream_callback=self._audio_callback
+            os.makedirs(RECORDINGS_DIR, exist_ok=True)
+            self._session_timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            self._segmenter = None
+            self._segment_index = 0
+            if mode == RecordingMode.VOICE_ACTIVATED:
+                # No file yet: the writer thread opens one per speech segment
+                self._file_path = None
+                self._segmenter = SpeechSegmenter(self._sample_rate, self._channels, self._vad_detector,
+                                                  hangover_ms=self._vad_hangover_ms)
+            else:
+                self._file_path = self._open_audio_file(f'{RECORDINGS_DIR}/recording_{self._session_timestamp}')
+            if self._streaming and self._segmenter is None:
+                self._transcription_queue = self._event_bus.get_queue('transcription')
+                self._transcription_queue.put({
+                    "type": STREAM_START,
+                    "stream_id": self._file_path,
+                    "sample_rate": self._sample_rate,
+                    "channels": self._channels
+                })
+            if self._shared_buffer is not None and self._segmenter is None:
+                self._segment_start = self._shared_buffer.frames_written
+            preroll = b''
+            if self._preroll_thread is not None:
+                # The stream is already running; hand the writer what it captured so far
+                preroll = self._stop_preroll()
+            else:
+                self._create_ring()
+            self._resampler = None
+            if self._capture_rate != self._sample_rate:
+                self._resampler = StreamingResampler(self._capture_rate, self._sample_rate, self._channels)
+            frame_bytes = self._channels * pyaudio.get_sample_size(self._format)
+            self._xruns = 0
+            self._dropped_baseline = self._ring.dropped_bytes
+            self._stop_mark = None
+            self._writer_stop.clear()
+            self._writer = threading.Thread(
+                target=self._writer_loop, args=(int(self._sample_rate * self._wav_block_seconds) * frame_bytes, preroll),
+                name="recorder-writer", daemon=True
             )
+            self._writer.start()
+            if self._stream is None:
+                self._open_stream()
             self._event_bus.publish(EventType.RECORDING_STARTED, self._file_path)
             self._logger.info(f"Started recording: {self._file_path}")
         except Exception as e:
             self._logger.error(f"Error starting recording: {e}")
             self._recording = False
 
-    def _audio_callback(self, in_data, frame_count, time_info, status):
+    def _create_ring(self):
+        self._capture_rate = self._negotiate_capture_rate()
+        frame_bytes = self._channels * pyaudio.get_sample_size(self._format)
+        self._ring = CaptureRingBuffer(int(self._capture_rate * self._ring_buffer_seconds) * frame_bytes, frame_bytes)
+
+    def _open_stream(self):
+        self._stream = self._audio.open(
+            format=self._format,
+            channels=self._channels,
+            rate=self._capture_rate,
+            input=True,
+            frames_per_buffer=self._chunk_size,
+            stream_callback=self._audio_callback
+        )
+
+    def _start_preroll(self):
+        """Open the input stream (once) and keep the latest preroll_ms of audio until the next recording."""
         try:
-            self._wave_file.writeframes(in_data)
+            if self._stream is None:
+                self._create_ring()
+                self._open_stream()
+            frame_bytes = self._channels * pyaudio.get_sample_size(self._format)
+            keep_bytes = int(self._capture_rate * self._preroll_ms / 1000) * frame_bytes
+            self._writer_stop.clear()
+            self._preroll_thread = threading.Thread(
+                target=self._preroll_loop, args=(keep_bytes,), name="recorder-preroll", daemon=True
+            )
+            self._preroll_thread.start()
         except Exception as e:
-            self._logger.error(f"Error writing audio data: {e}")
+            self._logger.error(f"Could not open input stream for pre-roll, opening it per recording: {e}")
+            self._preroll_ms = 0
+            self._preroll_thread = None
+            self._stream = None
+
+    def _preroll_loop(self, keep_bytes):
+        # The only reader of the ring buffer while no recording is in progress
+        while True:
+            self._trim_preroll(keep_bytes)
+            if self._writer_stop.wait(self.WRITER_POLL_INTERVAL):
+                break
+
+    def _trim_preroll(self, keep_bytes):
+        self._preroll_audio += self._ring.read()
+        excess = len(self._preroll_audio) - keep_bytes
+        if excess > 0:
+            del self._preroll_audio[:excess]
+
+    def _stop_preroll(self) -> bytes:
+        """Stop the pre-roll reader and return the audio it kept (at the capture rate)."""
+        self._writer_stop.set()
+        self._preroll_thread.join()
+        self._preroll_thread = None
+        # Nothing else reads the ring until the writer starts, so catch up to now
+        frame_bytes = self._channels * pyaudio.get_sample_size(self._format)
+        self._trim_preroll(int(self._capture_rate * self._preroll_ms / 1000) * frame_bytes)
+        preroll = bytes(self._preroll_audio)
+        self._preroll_audio.clear()
+        return preroll
+
+    def _open_audio_file(self, stem):
+        """Open the file a recording is written to, in the configured format, and return its path."""
+        if self._audio_format in AUDIO_FORMATS:
+            path = stem + AUDIO_FORMATS[self._audio_format][0]
+            self._audio_fileobj = open(path, 'wb')
+            try:
+                self._audio_file = StreamingEncoder(self._audio_fileobj, self._audio_format,
+                                                    self._sample_rate, self._channels)
+                return path
+            except Exception as e:
+                self._logger.error(f"Could not start {self._audio_format} encoder, recording WAV: {e}")
+                self._audio_fileobj.close()
+                os.remove(path)
+        path = stem + '.wav'
+        self._audio_fileobj = open(path, 'wb')
+        self._audio_file = wave.open(self._audio_fileobj, 'wb')
+        self._audio_file.setnchannels(self._channels)
+        self._audio_file.setsampwidth(self._audio.get_sample_size(self._format))
+        self._audio_file.setframerate(self._sample_rate)
+        return path
+
+    def _close_audio_file(self):
+        if self._audio_file is not None:
+            self._audio_file.close()
+            self._audio_file = None
+        if self._audio_fileobj is not None:
+            self._audio_fileobj.close()
+            self._audio_fileobj = None
+
+    def _negotiate_capture_rate(self):
+        """Capture at the target rate when the input device supports it, else at its default rate."""
+        try:
+            device = self._audio.get_default_input_device_info()
+            try:
+                if self._audio.is_format_supported(self._sample_rate, input_device=device['index'],
+                                                   input_channels=self._channels, input_format=self._format):
+                    return self._sample_rate
+            except ValueError:
+                pass
+            capture_rate = int(device['defaultSampleRate'])
+            self._logger.info(f"Device does not support {self._sample_rate} Hz; capturing at {capture_rate} Hz and resampling")
+            return capture_rate
+        except Exception as e:
+            self._logger.warning(f"Could not query input device, assuming {self._sample_rate} Hz: {e}")
+            return self._sample_rate
+
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        # Runs on the PortAudio thread: copy and return, nothing that can block
+        if status & pyaudio.paInputOverflow:
+            self._xruns += 1
+        self._ring.write(in_data)
         return (in_data, pyaudio.paContinue)
 
+    def _writer_loop(self, wav_block_bytes, preroll=b''):
+        """Drain the ring buffer until stopped, then flush what is left up to the stop mark."""
+        pending = bytearray()
+        last_checkpoint = time.monotonic()
+        if preroll:
+            self._deliver_audio(preroll, pending)
+        while True:
+            # Checked before draining: once set, everything up to the stop mark is in the ring
+            stopping = self._writer_stop.is_set()
+            data = self._ring.read(self._stop_mark - self._ring.bytes_read if stopping else None)
+            if data:
+                self._deliver_audio(data, pending)
+            if pending and (len(pending) >= wav_block_bytes or stopping):
+                try:
+                    self._audio_file.writeframes(bytes(pending))
+                    if not stopping and time.monotonic() - last_checkpoint >= self._checkpoint_seconds:
+                        self._checkpoint_audio_file()
+                        last_checkpoint = time.monotonic()
+                except Exception as e:
+                    self._logger.error(f"Error writing audio data: {e}")
+                pending.clear()
+            if stopping:
+                if self._segmenter is not None:
+                    for _, keep in self._segmenter.flush():
+                        self._finish_segment(pending, keep)
+                break
+            if not data:
+                self._writer_stop.wait(self.WRITER_POLL_INTERVAL)
+
+    def _checkpoint_audio_file(self):
+        """
+        Sync the recording to disk. wave.writeframes() rewrites the RIFF and data sizes
+        after every block (a seek and two 4-byte writes), so a synced WAV has a valid
+        header; FLAC and Ogg Opus decode without one. A crash loses at most the audio
+        since the last checkpoint.
+        """
+        self._audio_fileobj.flush()
+        os.fsync(self._audio_fileobj.fileno())
+
+    def _deliver_audio(self, data, pending):
+        try:
+            data = self._resampler.process(data) if self._resampler is not None else data
+            if self._segmenter is not None:
+                self._deliver_voice(data, pending)
+                return
+            if self._shared_buffer is not None:
+                self._shared_buffer.write(data)
+            if self._streaming:
+                self._transcription_queue.put({
+                    "type": STREAM_CHUNK,
+                    "stream_id": self._file_path,
+                    "pcm": data
+                })
+            pending += data
+        except Exception as e:
+            self._logger.error(f"Error processing audio data: {e}")
+
+    def _deliver_voice(self, data, pending):
+        for kind, payload in self._segmenter.feed(data):
+            if kind == SEGMENT_OPEN:
+                self._segment_index += 1
+                self._file_path = self._open_audio_file(
+                    f'{RECORDINGS_DIR}/recording_{self._session_timestamp}_{self._segment_index:03d}')
+                pending += payload
+            elif kind == SEGMENT_AUDIO:
+                pending += payload
+            else:
+                self._finish_segment(pending, keep=payload)
+
+    def _finish_segment(self, pending, keep):
+        """Write out and close the current speech segment, then queue it or, if too short to be speech, delete it."""
+        try:
+            if pending:
+                self._audio_file.writeframes(bytes(pending))
+            self._close_audio_file()
+            if keep:
+                self._event_bus.get_queue('transcription').put(self._file_path)
+                self._logger.info(f"Queued speech segment: {self._file_path}")
+                Metrics().increment("recorder_vad_segments")
+            else:
+                os.remove(self._file_path)
+        except Exception as e:
+            self._logger.error(f"Error finishing speech segment {self._file_path}: {e}")
+        finally:
+            pending.clear()
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames of the current/last recording lost because the ring buffer was full."""
+        if self._ring is None:
+            return 0
+        return (self._ring.dropped_bytes - self._dropped_baseline) // (self._channels * pyaudio.get_sample_size(self._format))
+
+    @property
+    def xrun_count(self) -> int:
+        """Input overflows PortAudio reported for the current/last recording."""
+        return self._xruns
+
+    def _report_capture_stats(self):
+        metrics = Metrics()
+        metrics.increment("recorder_dropped_frames", self.dropped_frames)
+        metrics.increment("recorder_xruns", self._xruns)
+        frame_bytes = self._channels * pyaudio.get_sample_size(self._format)
+        metrics.record("recorder_ring_high_water_s", self._ring.high_water / frame_bytes / self._capture_rate)
+        if self._segmenter is not None and self._segmenter.frames_seen:
+            metrics.record("recorder_vad_kept_ratio", self._segmenter.frames_kept / self._segmenter.frames_seen)
+        if self.dropped_frames or self._xruns:
+            self._logger.warning(f"Recording {self._file_path} lost audio: {self.dropped_frames} frame(s) dropped, "
+                                 f"{self._xruns} input overflow(s)")
+
     def stop_recording(self):
         if not self._recording:
             self._logger.warning("No recording in progress to stop.")
             return
         try:
             self._recording = False
-            if self._stream:
+            if self._stream and not self._preroll_ms:
                 self._stream.stop_stream()
                 self._stream.close()
                 self._stream = None
-            if self._wave_file:
-                self._wave_file.close()
-                self._wave_file = None
-            self._event_bus.get_queue('transcription').put(self._file_path)
+            if self._writer is not None:
+                # With pre-roll the stream keeps running: audio after this point belongs to the next recording
+                self._stop_mark = self._ring.bytes_written
+                self._writer_stop.set()
+                self._writer.join()
+                self._writer = None
+                self._report_capture_stats()
+            self._close_audio_file()
+            if self._preroll_ms:
+                self._start_preroll()
+            # Voice-activated sessions queued each speech segment as it ended
+            if self._segmenter is None:
+                self._queue_recording()
             self._event_bus.publish(EventType.RECORDING_STOPPED, self._file_path)
             self._logger.info(f"Stopped recording: {self._file_path}")
             return self._file_path
         except Exception as e:
             self._logger.error(f"Error stopping recording: {e}")
 
-    def toggle_recording(self):
+    def _queue_recording(self):
+        if self._streaming:
+            # The worker already has the audio; only the end-of-stream marker is left
+            self._transcription_queue.put({
+                "type": STREAM_END,
+                "stream_id": self._file_path,
+                "audio_path": self._file_path
+            })
+        elif self._shared_buffer is not None:
+            self._event_bus.get_queue('transcription').put({
+                "audio_path": self._file_path,
+                "pcm": self._shared_buffer.describe(self._segment_start, self._shared_buffer.frames_written)
+            })
+        else:
+            self._event_bus.get_queue('transcription').put(self._file_path)
+
+    def toggle_recording(self, mode=RecordingMode.TOGGLE):
         if self._recording:
             return self.stop_recording()
         else:
-            return self.start_recording(RecordingMode.TOGGLE)
+            return self.start_recording(mode)
 
     def cleanup(self):
         try:
             if self._recording:
                 self.stop_recording()
+            if self._preroll_thread is not None:
+                self._stop_preroll()
+            if self._stream:
+                self._stream.stop_stream()
+                self._stream.close()
+                self._stream = None
             self._audio.terminate()
+            if self._shared_buffer is not None:
+                self._shared_buffer.close()
+                self._shared_buffer = None
             self._logger.info("Recorder cleaned up and PyAudio terminated.")
         except Exception as e:
             self._logger.error(f"Error during cleanup: {e}") 
\ No newline at end of file
@@ -0,0 +1,122 @@
+# src/recorder/recovery.py
+"""
+Startup recovery of recordings that were never transcribed, e.g. because the app
+exited between stopping a recording and saving its transcription.
+"""
+
+import os
+import threading
+import time
+import wave
+from typing import List, Optional
+from whisperdesktop.recorder.recorder import RECORDINGS_DIR, RECORDING_EXTENSIONS
+from whisperdesktop.utils.audio import repair_wav
+from whisperdesktop.utils.logger import Logger
+
+logger = Logger()
+
+# Queue priority of recovered jobs; live recordings use 0 and are always dispatched first
+RECOVERY_PRIORITY = 10
+# Smallest WAV that holds any audio (the header alone is 44 bytes)
+_MIN_WAV_BYTES = 45
+
+
+def find_orphaned_recordings(storage_manager, recordings_dir: str = RECORDINGS_DIR,
+                             modified_before: Optional[float] = None, job_queue=None) -> List[str]:
+    """
+    List recordings in `recordings_dir` that no saved transcription references, oldest first.
+    Args:
+        storage_manager (StorageManager): Used to look up transcriptions.audio_path
+        recordings_dir (str): Directory the Recorder writes to
+        modified_before (Optional[float]): Ignore files modified at or after this time, so
+            recordings made since startup are left to the normal pipeline
+        job_queue (JobQueue): If given, recordings whose job is already done or failed
+            (silent, or undecodable) are not recovered again
+    Returns:
+        List[str]: Paths in the same form the Recorder enqueues them
+    """
+    try:
+        entries = list(os.scandir(recordings_dir))
+    except FileNotFoundError:
+        return []
+    candidates = []
+    for entry in entries:
+        if not entry.name.lower().endswith(RECORDING_EXTENSIONS) or not entry.is_file():
+            continue
+        stat = entry.stat()
+        if modified_before is not None and stat.st_mtime >= modified_before:
+            continue
+        if stat.st_size < _MIN_WAV_BYTES:
+            logger.warning(f"Skipping empty recording: {entry.path}")
+            continue
+        candidates.append((stat.st_mtime, os.path.join(recordings_dir, entry.name)))
+    candidates.sort()
+    unsaved = storage_manager.find_unsaved_audio_paths([path for _, path in candidates])
+    if job_queue is None:
+        return unsaved
+    finished = job_queue.finished_audio_paths(unsaved)
+    return [path for path in unsaved if path not in finished]
+
+
+def _is_readable_wav(path: str) -> bool:
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() > 0
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+class RecoveryScanner:
+    """
+    Scans for orphaned recordings in a background thread and puts them on the
+    transcription queue at RECOVERY_PRIORITY. The scan starts after `delay` seconds so
+    it does not compete with model loading and the first recording of the session.
+    """
+    def __init__(self, storage_manager, transcription_queue, recordings_dir: str = RECORDINGS_DIR,
+                 delay: float = 10.0, job_queue=None):
+        self._storage_manager = storage_manager
+        self._job_queue = job_queue
+        self._transcription_queue = transcription_queue
+        self._recordings_dir = recordings_dir
+        self._delay = delay
+        # Anything written after this belongs to the current session
+        self._started_at = time.time()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="recording-recovery", daemon=True)
+        self.recovered: List[str] = []
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        if self._stop_event.wait(self._delay):
+            return
+        try:
+            orphans = find_orphaned_recordings(self._storage_manager, self._recordings_dir,
+                                               modified_before=self._started_at, job_queue=self._job_queue)
+        except Exception as e:
+            logger.error(f"Recording recovery scan failed: {e}")
+            return
+        for path in orphans:
+            if self._stop_event.is_set():
+                break
+            # FLAC and Ogg Opus recordings decode as they are, even when cut short
+            if path.lower().endswith('.wav'):
+                try:
+                    if repair_wav(path):
+                        logger.info(f"Repaired WAV header of interrupted recording: {path}")
+                except (wave.Error, OSError) as e:
+                    logger.warning(f"Could not repair recording {path}: {e}")
+                if not _is_readable_wav(path):
+                    logger.warning(f"Skipping unreadable recording: {path}")
+                    continue
+            self._transcription_queue.put({"audio_path": path, "priority": RECOVERY_PRIORITY, "recovered": True})
+            self.recovered.append(path)
+        if self.recovered:
+            logger.info(f"Re-queued {len(self.recovered)} untranscribed recording(s)")
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,116 @@
+# src/recorder/shared_pcm_buffer.py
+"""
+Shared-memory ring buffer for handing captured PCM to the transcriber process
+without a WAV round-trip through disk.
+"""
+
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+import numpy as np
+
+# Header layout (int64 each): frames written so far, capacity in frames, channels, sample rate
+_HEADER_FIELDS = 4
+_HEADER_BYTES = _HEADER_FIELDS * 8
+
+
+class SharedPCMRingBuffer:
+    """
+    Single-producer ring buffer of int16 frames in a `multiprocessing.shared_memory` block.
+
+    The recorder appends frames and hands out (start, end) frame ranges; the worker
+    process attaches by name and copies a range out. Frame positions are absolute
+    and only ever grow, so a reader can tell when a range has been overwritten.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self._header[1])
+        self.channels = int(self._header[2])
+        self.sample_rate = int(self._header[3])
+        self._data = np.ndarray((self.capacity * self.channels,), dtype=np.int16, buffer=shm.buf, offset=_HEADER_BYTES)
+
+    @classmethod
+    def create(cls, capacity_frames: int, channels: int, sample_rate: int) -> "SharedPCMRingBuffer":
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + capacity_frames * channels * 2)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, capacity_frames, channels, sample_rate)
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPCMRingBuffer":
+        if sys.version_info >= (3, 13):
+            return cls(shared_memory.SharedMemory(name=name, track=False), owner=False)
+        # Only the creating process may unlink the block. Processes started by
+        # multiprocessing normally share the creator's resource tracker (spawn and
+        # forkserver pass it on, fork inherits it if it was already running), and must
+        # not unregister the block there. A process with no tracker yet starts its own
+        # on attach, which would destroy the block when the process exits.
+        own_tracker = shared_memory._USE_POSIX and resource_tracker._resource_tracker._fd is None
+        shm = shared_memory.SharedMemory(name=name)
+        if own_tracker:
+            try:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def frames_written(self) -> int:
+        return int(self._header[0])
+
+    def write(self, data) -> None:
+        """Append interleaved int16 PCM (bytes) and publish the new write position."""
+        samples = np.frombuffer(data, dtype=np.int16)
+        frames = len(samples) // self.channels
+        samples = samples[:frames * self.channels]
+        skipped = max(0, frames - self.capacity)
+        if skipped:
+            samples = samples[skipped * self.channels:]
+        written = self.frames_written
+        start = ((written + skipped) % self.capacity) * self.channels
+        first = min(len(samples), len(self._data) - start)
+        self._data[start:start + first] = samples[:first]
+        if first < len(samples):
+            self._data[:len(samples) - first] = samples[first:]
+        # Position is published after the copy so readers never see half-written frames
+        self._header[0] = written + frames
+
+    def read(self, start: int, end: int) -> Optional[np.ndarray]:
+        """Copy frames [start, end) out of the buffer, or None if they were overwritten."""
+        if end > self.frames_written or self.frames_written - start > self.capacity or end < start:
+            return None
+        lo = (start % self.capacity) * self.channels
+        n = (end - start) * self.channels
+        if lo + n <= len(self._data):
+            samples = self._data[lo:lo + n].copy()
+        else:
+            head = len(self._data) - lo
+            samples = np.concatenate([self._data[lo:], self._data[:n - head]])
+        # The writer may have lapped the range while it was being copied
+        if self.frames_written - start > self.capacity:
+            return None
+        return samples
+
+    def describe(self, start: int, end: int) -> dict:
+        """Picklable reference to a frame range, for the transcription queue."""
+        return {
+            "name": self.name,
+            "start": start,
+            "end": end,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels
+        }
+
+    def close(self) -> None:
+        self._header = None
+        self._data = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
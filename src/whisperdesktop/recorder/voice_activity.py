@@ -0,0 +1,154 @@
+# src/recorder/voice_activity.py
+"""
+Voice activity detection for the hands-free recording mode: frame-level speech
+detection and a segmenter that turns a continuous capture into speech segments.
+"""
+
+from collections import deque
+from typing import List, Optional, Tuple
+import numpy as np
+from whisperdesktop.utils.audio import pcm16_to_float32, WHISPER_SAMPLE_RATE
+from whisperdesktop.utils.logger import Logger
+
+logger = Logger()
+
+# Silero VAD scores 32 ms frames of 16 kHz audio
+VAD_FRAME_SAMPLES = 512
+VAD_FRAME_SECONDS = VAD_FRAME_SAMPLES / WHISPER_SAMPLE_RATE
+
+# Events returned by SpeechSegmenter.feed()
+SEGMENT_OPEN = "open"
+SEGMENT_AUDIO = "audio"
+SEGMENT_CLOSE = "close"
+
+
+class VoiceActivityDetector:
+    """
+    Classifies frames as speech or silence. Frames quieter than `energy_threshold` are
+    silence without further work; the rest are scored by Silero VAD, the ONNX model
+    bundled with faster-whisper, on the CPU. If the model cannot be loaded (e.g.
+    onnxruntime is missing) the energy gate decides on its own.
+    """
+    def __init__(self, energy_threshold: float = 0.01, speech_threshold: float = 0.5, use_model: bool = True):
+        self.energy_threshold = energy_threshold
+        self.speech_threshold = speech_threshold
+        self._use_model = use_model
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None and self._use_model:
+            try:
+                from faster_whisper.vad import get_vad_model
+                self._model = get_vad_model()
+            except Exception as e:
+                logger.warning(f"Silero VAD unavailable, using the energy gate only: {e}")
+                self._use_model = False
+        return self._model
+
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            frames (np.ndarray): float32 array of shape (n, samples_per_frame), 32 ms per frame
+        Returns:
+            np.ndarray: One bool per frame
+        """
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        speech = rms >= self.energy_threshold
+        if not speech.any():
+            return speech
+        model = self._get_model()
+        if model is None:
+            return speech
+        loud = frames[speech]
+        if loud.shape[1] != VAD_FRAME_SAMPLES:
+            # Device rate other than 16 kHz: nearest-sample decimation is plenty for VAD
+            loud = loud[:, np.linspace(0, loud.shape[1] - 1, VAD_FRAME_SAMPLES).round().astype(int)]
+        probabilities = np.asarray(model(np.ascontiguousarray(loud, dtype=np.float32).ravel())).ravel()
+        speech[speech] = probabilities >= self.speech_threshold
+        return speech
+
+
+class SpeechSegmenter:
+    """
+    Cuts interleaved int16 PCM into speech segments. A segment opens after `start_ms`
+    of consecutive speech, starting `padding_ms` before it, and closes after
+    `hangover_ms` of silence. Audio between segments is discarded. feed() returns the
+    events for each segment in order: (SEGMENT_OPEN, padding audio), (SEGMENT_AUDIO,
+    audio)... and (SEGMENT_CLOSE, keep), where keep is False for segments with less
+    than `min_speech_ms` of speech.
+    """
+    def __init__(self, sample_rate: int = WHISPER_SAMPLE_RATE, channels: int = 1,
+                 detector: Optional[VoiceActivityDetector] = None, start_ms: int = 96,
+                 hangover_ms: int = 800, padding_ms: int = 300, min_speech_ms: int = 250):
+        self._channels = channels
+        self._detector = detector or VoiceActivityDetector()
+        self._frame_samples = int(round(sample_rate * VAD_FRAME_SECONDS))
+        self._frame_bytes = self._frame_samples * channels * 2
+        frames = lambda ms: max(1, int(round(ms / 1000.0 / VAD_FRAME_SECONDS)))
+        self._start_frames = frames(start_ms)
+        self._hangover_frames = frames(hangover_ms)
+        self._min_speech_frames = frames(min_speech_ms)
+        self._padding = deque(maxlen=max(frames(padding_ms), self._start_frames))
+        self._partial = bytearray()
+        self._active = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._segment_speech = 0
+        self.frames_seen = 0
+        self.frames_kept = 0
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def feed(self, data) -> List[Tuple[str, object]]:
+        self._partial += data
+        n_frames = len(self._partial) // self._frame_bytes
+        if n_frames == 0:
+            return []
+        size = n_frames * self._frame_bytes
+        block = bytes(self._partial[:size])
+        del self._partial[:size]
+        audio = pcm16_to_float32(block, self._channels)
+        speech = self._detector.is_speech(audio.reshape(n_frames, self._frame_samples))
+        events = []
+        audio_run = bytearray()
+        for i in range(n_frames):
+            frame = block[i * self._frame_bytes:(i + 1) * self._frame_bytes]
+            self.frames_seen += 1
+            if not self._active:
+                self._padding.append(frame)
+                self._speech_run = self._speech_run + 1 if speech[i] else 0
+                if self._speech_run >= self._start_frames:
+                    self._active = True
+                    self._silence_run = 0
+                    self._segment_speech = self._speech_run
+                    self.frames_kept += len(self._padding)
+                    events.append((SEGMENT_OPEN, b''.join(self._padding)))
+                    self._padding.clear()
+                continue
+            audio_run += frame
+            self.frames_kept += 1
+            if speech[i]:
+                self._silence_run = 0
+                self._segment_speech += 1
+                continue
+            self._silence_run += 1
+            if self._silence_run >= self._hangover_frames:
+                events.append((SEGMENT_AUDIO, bytes(audio_run)))
+                audio_run.clear()
+                events.extend(self._close())
+        if audio_run:
+            events.append((SEGMENT_AUDIO, bytes(audio_run)))
+        return events
+
+    def flush(self) -> List[Tuple[str, object]]:
+        """Close the open segment, if any, once capture has stopped."""
+        self._partial.clear()
+        self._padding.clear()
+        return self._close() if self._active else []
+
+    def _close(self) -> List[Tuple[str, object]]:
+        self._active = False
+        self._speech_run = 0
+        return [(SEGMENT_CLOSE, self._segment_speech >= self._min_speech_frames)]
@@ -0,0 +1,260 @@
+# src/storage/job_queue.py
+"""
+Durable transcription job queue stored in the transcriptions database.
+
+Jobs move through queued -> running -> done, or back to queued with a backoff
+delay when an attempt fails, and to failed once their attempts are used up.
+Jobs left running by a previous session are re-queued on start-up.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.metrics import Metrics
+
+logger = Logger()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        audio_path TEXT,
+        payload TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        duration REAL NOT NULL DEFAULT 0,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        available_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        worker_id INTEGER,
+        last_error TEXT
+    )
+    """,
+    # Claim order: the same (priority, duration) order the in-memory dispatcher used
+    "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(state, priority, duration, id)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_audio_path ON jobs(audio_path)",
+]
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue. Thread-safe; claims run in BEGIN IMMEDIATE transactions,
+    so concurrent claimers (threads or processes) never receive the same job.
+    """
+    def __init__(self, db_path: Optional[str] = None, max_attempts: int = 3,
+                 retry_base_delay: float = 5.0, retry_max_delay: float = 300.0):
+        self._db_path = db_path or os.path.join(os.getcwd(), 'transcriptions.db')
+        self._max_attempts = max_attempts
+        self._retry_base_delay = retry_base_delay
+        self._retry_max_delay = retry_max_delay
+        self._lock = threading.RLock()
+        # Whether job counts may have changed since the gauges were last published
+        self._changed = True
+        # Earliest time a queued job becomes claimable; claim() skips the database
+        # before then, so an idle dispatcher polling it costs nothing
+        self._next_available = 0.0
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE. The
+        # timeout makes BEGIN wait for the StorageManager's writes instead of failing.
+        self._conn = sqlite3.connect(self._db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if self._conn is None:
+                raise sqlite3.ProgrammingError("JobQueue is closed")
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def enqueue(self, job, priority: int = 0, duration: float = 0.0) -> Optional[int]:
+        """
+        Add a job (a file path or a job dict, as put on the transcription queue).
+        Returns:
+            Optional[int]: The job ID, or None if the same recording is already queued or running
+        """
+        audio_path = job.get("audio_path") if isinstance(job, dict) else job
+        now = time.time()
+        with self._transaction() as conn:
+            if audio_path is not None and conn.execute(
+                "SELECT 1 FROM jobs WHERE audio_path = ? AND state IN (?, ?) LIMIT 1",
+                (audio_path, QUEUED, RUNNING)
+            ).fetchone():
+                return None
+            cursor = conn.execute(
+                """
+                INSERT INTO jobs (audio_path, payload, priority, duration, state, available_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (audio_path, json.dumps(job), priority, duration, QUEUED, now, now)
+            )
+            self._changed = True
+            self._next_available = min(self._next_available, now)
+            return cursor.lastrowid
+
+    def claim(self, worker_id: int) -> Optional[Tuple[int, object]]:
+        """
+        Atomically take the next runnable job and mark it running.
+        Returns:
+            Optional[Tuple[int, object]]: (job ID, job) or None if nothing is runnable
+        """
+        now = time.time()
+        if now < self._next_available:
+            return None
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT id, payload FROM jobs
+                WHERE state = ? AND available_at <= ?
+                ORDER BY priority, duration, id
+                LIMIT 1
+                """,
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                next_available = conn.execute(
+                    "SELECT MIN(available_at) FROM jobs WHERE state = ?", (QUEUED,)
+                ).fetchone()[0]
+                self._next_available = next_available if next_available is not None else float("inf")
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, started_at = ?, worker_id = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, now, worker_id, row[0])
+            )
+            self._changed = True
+        return row[0], json.loads(row[1])
+
+    def complete(self, job_id: int):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, last_error = NULL WHERE id = ?",
+                (DONE, time.time(), job_id)
+            )
+            self._changed = True
+
+    def fail(self, job_id: int, error: str) -> str:
+        """
+        Record a failed attempt. The job is retried after an exponential backoff delay
+        until it has been attempted max_attempts times.
+        Returns:
+            str: The job's new state (QUEUED or FAILED)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return FAILED
+            attempts = row[0]
+            self._changed = True
+            if attempts >= self._max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ?, last_error = ? WHERE id = ?",
+                    (FAILED, now, error, job_id)
+                )
+                logger.error(f"Job {job_id} failed after {attempts} attempt(s): {error}")
+                return FAILED
+            delay = min(self._retry_base_delay * 2 ** (attempts - 1), self._retry_max_delay)
+            conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, worker_id = NULL, last_error = ? WHERE id = ?",
+                (QUEUED, now + delay, error, job_id)
+            )
+            self._next_available = min(self._next_available, now + delay)
+            logger.warning(f"Job {job_id} attempt {attempts} failed, retrying in {delay:.0f}s: {error}")
+            return QUEUED
+
+    def requeue_running(self) -> int:
+        """Put jobs left running by a previous session back in the queue. Returns how many."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, worker_id = NULL, available_at = ? WHERE state = ?",
+                (QUEUED, time.time(), RUNNING)
+            )
+            if cursor.rowcount:
+                self._changed = True
+                self._next_available = 0.0
+            return cursor.rowcount
+
+    def purge(self, older_than: float = 7 * 24 * 3600) -> int:
+        """Delete done jobs finished more than `older_than` seconds ago. Returns how many."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE state = ? AND finished_at < ?",
+                (DONE, time.time() - older_than)
+            )
+            return cursor.rowcount
+
+    def finished_audio_paths(self, audio_paths: List[str]) -> Set[str]:
+        """
+        Return the paths among `audio_paths` whose job is done or has failed for good,
+        e.g. recordings that transcribed to nothing or could never be decoded.
+        """
+        finished = set()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(audio_paths), 500):
+                chunk = audio_paths[i:i + 500]
+                finished.update(row[0] for row in self._conn.execute(
+                    f"SELECT audio_path FROM jobs WHERE state IN (?, ?) AND audio_path IN ({', '.join('?' * len(chunk))})",
+                    [DONE, FAILED] + chunk
+                ).fetchall())
+        return finished
+
+    def depth(self) -> int:
+        """Number of queued jobs, including ones waiting out a retry delay."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (QUEUED,)).fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Job counts per state and the age in seconds of the oldest queued job."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM jobs WHERE state = ?", (QUEUED,)).fetchone()[0]
+        stats = {state: counts.get(state, 0) for state in (QUEUED, RUNNING, DONE, FAILED)}
+        stats["oldest_queued_age"] = time.time() - oldest if oldest is not None else 0.0
+        return stats
+
+    def publish_metrics(self, changed_only: bool = False) -> Optional[Dict[str, float]]:
+        """
+        Update the job_queue_* gauges in Metrics and return the stats.
+        Args:
+            changed_only (bool): Skip the update (and return None) if no job has been
+                added or changed state since the last one
+        """
+        with self._lock:
+            if changed_only and not self._changed:
+                return None
+            self._changed = False
+        stats = self.stats()
+        metrics = Metrics()
+        metrics.set_gauge("job_queue_depth", stats[QUEUED])
+        metrics.set_gauge("job_queue_running", stats[RUNNING])
+        metrics.set_gauge("job_queue_failed", stats[FAILED])
+        metrics.set_gauge("job_queue_oldest_age_s", stats["oldest_queued_age"])
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
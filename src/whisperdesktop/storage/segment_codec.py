@@ -0,0 +1,119 @@
+# src/storage/segment_codec.py
+"""
+Compact binary encoding for transcription segments.
+
+Layout (little endian):
+    header   magic b"SG", version (u8), flags (u8), segment count (u32), first id (u32)
+    records  count x (start f32, end f32, end offset of the segment's text (u32))
+    text     UTF-8 text of all segments, concatenated
+
+Only "canonical" segment lists, as produced by the transcriber, can be packed:
+every segment has exactly start/end/text, plus optionally consecutive ids (any
+first id; faster-whisper numbers segments from 1). Anything else is left to the
+caller to store as JSON. Version 1 blobs (no first id, ids from 0) still decode.
+"""
+
+import struct
+from typing import List, Optional, Tuple
+
+MAGIC = b"SG"
+VERSION = 2
+FLAG_IDS = 0x01
+
+_HEADER = struct.Struct("<2sBBI")
+_ID_BASE = struct.Struct("<I")
+_RECORD = struct.Struct("<ffI")
+# Timestamps are rounded on decode so float32 noise (e.g. 1.2000000476) does not leak out
+TIME_DECIMALS = 3
+
+_KEYS = frozenset(("start", "end", "text"))
+_KEYS_WITH_ID = frozenset(("id", "start", "end", "text"))
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _packable(segments: List[dict]) -> Optional[Tuple[bool, int]]:
+    """Return (whether segments carry ids, first id) if they can be packed, else None."""
+    with_ids = None
+    id_base = 0
+    for index, segment in enumerate(segments):
+        if not isinstance(segment, dict):
+            return None
+        keys = segment.keys()
+        has_id = keys == _KEYS_WITH_ID
+        if not has_id and keys != _KEYS:
+            return None
+        if with_ids is None:
+            with_ids = has_id
+            if has_id:
+                id_base = segment["id"]
+                if not isinstance(id_base, int) or isinstance(id_base, bool) or not 0 <= id_base <= 0xFFFFFFFF:
+                    return None
+        if has_id != with_ids or (has_id and segment["id"] != id_base + index):
+            return None
+        if not (_is_number(segment["start"]) and _is_number(segment["end"]) and isinstance(segment["text"], str)):
+            return None
+    return bool(with_ids), id_base
+
+
+def pack_segments(segments: List[dict]) -> Optional[bytes]:
+    """
+    Pack `segments` into the binary layout above.
+    Args:
+        segments (List[dict]): Segment dicts
+    Returns:
+        Optional[bytes]: The packed blob, or None if the segments are not canonical
+    """
+    packable = _packable(segments)
+    if packable is None:
+        return None
+    with_ids, id_base = packable
+    records = bytearray(_HEADER.pack(MAGIC, VERSION, FLAG_IDS if with_ids else 0, len(segments)))
+    records += _ID_BASE.pack(id_base)
+    texts = []
+    offset = 0
+    for segment in segments:
+        encoded = segment["text"].encode("utf-8")
+        offset += len(encoded)
+        texts.append(encoded)
+        records += _RECORD.pack(segment["start"], segment["end"], offset)
+    return bytes(records) + b"".join(texts)
+
+
+def unpack_segments(blob: bytes) -> List[dict]:
+    """
+    Decode a blob produced by pack_segments.
+    Args:
+        blob (bytes): Packed segments
+    Returns:
+        List[dict]: Segment dicts, with start/end rounded to TIME_DECIMALS
+    Raises:
+        ValueError: If the blob is not in a known format
+    """
+    magic, version, flags, count = _HEADER.unpack_from(blob, 0)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"Unknown segment blob format {magic!r} v{version}")
+    records_base = _HEADER.size
+    id_base = 0
+    if version >= 2:
+        id_base, = _ID_BASE.unpack_from(blob, records_base)
+        records_base += _ID_BASE.size
+    text_base = records_base + count * _RECORD.size
+    records = _RECORD.iter_unpack(blob[records_base:text_base])
+    segments = []
+    previous = text_base
+    for index, (start, end, offset) in enumerate(records):
+        offset += text_base
+        segments.append({
+            "id": id_base + index,
+            "start": round(start, TIME_DECIMALS),
+            "end": round(end, TIME_DECIMALS),
+            "text": blob[previous:offset].decode("utf-8")
+        })
+        previous = offset
+    if not flags & FLAG_IDS:
+        for segment in segments:
+            del segment["id"]
+    return segments
@@ -1,18 +1,129 @@
 import os
+import queue
 import sqlite3
-from typing import Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
 from whisperdesktop.event_bus.event_bus import EventBus
 from whisperdesktop.utils.logger import Logger
 from whisperdesktop.event_bus.event_bus import EventType
+from whisperdesktop.storage.segment_codec import pack_segments, unpack_segments
+
+# Largest SQLite rowid; the keyset cursor used for the first page of history
+_MAX_ROWID = 2 ** 63 - 1
+
+# Schema migrations, applied in order on top of the original transcriptions table.
+# The database's PRAGMA user_version records how many have been applied.
+_MIGRATIONS: List[List[str]] = [
+    # 1: indexes for date-range history queries and audio file lookups
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transcriptions_timestamp ON transcriptions(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_transcriptions_audio_path ON transcriptions(audio_path)",
+    ],
+    # 2: full-text index over text, kept in sync by triggers and backfilled from existing rows
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transcriptions_fts USING fts5(
+            text, content='transcriptions', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS transcriptions_fts_insert AFTER INSERT ON transcriptions BEGIN
+            INSERT INTO transcriptions_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS transcriptions_fts_delete AFTER DELETE ON transcriptions BEGIN
+            INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS transcriptions_fts_update AFTER UPDATE OF text ON transcriptions BEGIN
+            INSERT INTO transcriptions_fts(transcriptions_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO transcriptions_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """,
+        "INSERT INTO transcriptions_fts(transcriptions_fts) VALUES ('rebuild')",
+    ],
+    # 3: packed segments (see segment_codec); segments_metadata keeps JSON only for
+    # segment lists that cannot be packed, and for rows written before this migration
+    [
+        "ALTER TABLE transcriptions ADD COLUMN segments_blob BLOB",
+    ],
+]
+
+# History columns, without segments unless the caller asks for them
+_HISTORY_COLUMNS = "id, timestamp, text, audio_path"
+_HISTORY_COLUMNS_WITH_SEGMENTS = "id, timestamp, text, audio_path, segments_metadata, segments_blob"
+
+
+def _encode_segments(segments: list) -> tuple:
+    """Return the (segments_metadata, segments_blob) column values for `segments`."""
+    import json
+    blob = pack_segments(segments)
+    if blob is not None:
+        return "", blob
+    return json.dumps(segments), None
+
+
+def _decode_segments(segments_json: str, blob: Optional[bytes]) -> list:
+    import json
+    if blob is not None:
+        return unpack_segments(blob)
+    return json.loads(segments_json) if segments_json else []
+
+
+def _row_to_dict(row: tuple) -> dict:
+    transcription = {
+        "id": row[0],
+        "timestamp": row[1],
+        "text": row[2],
+        "audio_path": row[3]
+    }
+    if len(row) > 4:
+        transcription["segments_metadata"] = _decode_segments(row[4], row[5])
+    return transcription
+
+
+def _fts_query(query: str) -> str:
+    """
+    Turn free text typed by the user into an FTS5 query: every word must match, the
+    last one as a prefix (search-as-you-type). Words are quoted, so FTS5 operators and
+    punctuation in the input are treated as plain text.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if not terms:
+        return ""
+    terms[-1] += "*"
+    return " ".join(terms)
 
 class StorageManager:
     """
     Handles SQLite database initialization and connection management for transcriptions.
+    One connection is opened per StorageManager and shared by all threads; access is
+    serialized by a lock.
     """
-    def __init__(self, db_path: Optional[str] = None, event_bus: Optional[EventBus] = None):
+    # Size of sqlite3's per-connection prepared statement cache
+    STATEMENT_CACHE_SIZE = 128
+
+    def __init__(self, db_path: Optional[str] = None, event_bus: Optional[EventBus] = None,
+                 write_behind_window: float = 0.05, write_behind_max_batch: int = 64):
         self._db_path = db_path or os.path.join(os.getcwd(), 'transcriptions.db')
         self._event_bus = event_bus if event_bus is not None else EventBus()
+        self._lock = threading.RLock()
+        self._conn = self._open_connection()
         self._initialize_db()
+        # Write-behind queue (see enqueue_save); the writer thread starts on first use
+        self._write_behind_window = write_behind_window
+        self._write_behind_max_batch = write_behind_max_batch
+        self._save_queue: "queue.Queue" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
 
     def _initialize_db(self):
         try:
@@ -27,15 +138,79 @@ class StorageManager:
                         audio_path TEXT
                     )
                 """)
+                self._migrate(cursor)
                 conn.commit()
         except sqlite3.Error as e:
             Logger().error(f"Failed to initialize database: {e}")
 
+    def _migrate(self, cursor: sqlite3.Cursor):
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for target, statements in enumerate(_MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            Logger().info(f"Migrated transcriptions database to schema version {target}")
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, check_same_thread=False,
+                               cached_statements=self.STATEMENT_CACHE_SIZE)
+        # WAL lets readers run alongside the writer and needs one fsync per checkpoint
+        # instead of one per commit; NORMAL is durable across application crashes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
     def _get_connection(self):
         """
-        Context manager for SQLite connection.
+        Context manager for the shared SQLite connection. Holds the connection lock for
+        the duration of the block, commits on success and rolls back on error.
         """
-        return sqlite3.connect(self._db_path)
+        with self._lock:
+            if self._conn is None:
+                raise sqlite3.ProgrammingError("StorageManager is closed")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+
+    def close(self):
+        """
+        Write out queued saves, then close the database connection.
+        The StorageManager cannot be used afterwards.
+        """
+        with self._writer_lock:
+            writer, self._writer_thread = self._writer_thread, None
+        if writer is not None:
+            self._save_queue.put(None)
+            writer.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _validate(text, segments_metadata):
+        if not isinstance(text, str) or not text:
+            raise ValueError("text must be a non-empty string")
+        if not isinstance(segments_metadata, list):
+            raise ValueError("segments_metadata must be a list")
+
+    @staticmethod
+    def _insert(cursor: sqlite3.Cursor, timestamp: str, text: str, segments_metadata: list,
+                audio_path: Optional[str]) -> int:
+        segments_json, segments_blob = _encode_segments(segments_metadata)
+        cursor.execute(
+            """
+            INSERT INTO transcriptions (timestamp, text, segments_metadata, segments_blob, audio_path)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (timestamp, text, segments_json, segments_blob, audio_path)
+        )
+        return cursor.lastrowid
 
     def save_transcription(self, text: str, segments_metadata: list, audio_path: Optional[str] = None) -> int:
         """
@@ -51,28 +226,16 @@ class StorageManager:
             ValueError: If parameters are invalid
             RuntimeError: On database errors
         """
-        if not isinstance(text, str) or not text:
-            raise ValueError("text must be a non-empty string")
-        if not isinstance(segments_metadata, list):
-            raise ValueError("segments_metadata must be a list")
-        import json
+        self._validate(text, segments_metadata)
         import datetime
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 timestamp = datetime.datetime.now().isoformat()
-                segments_json = json.dumps(segments_metadata)
-                cursor.execute(
-                    """
-                    INSERT INTO transcriptions (timestamp, text, segments_metadata, audio_path)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (timestamp, text, segments_json, audio_path)
-                )
-                transcription_id = cursor.lastrowid
+                transcription_id = self._insert(cursor, timestamp, text, segments_metadata, audio_path)
                 conn.commit()
                 # Publish event
-                self._event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, {
+                self._event_bus.publish(EventType.TRANSCRIPTION_SAVED, {
                     "id": transcription_id,
                     "timestamp": timestamp,
                     "text": text
@@ -82,79 +245,270 @@ class StorageManager:
             Logger().error(f"Failed to save transcription: {e}")
             return -1
 
-    def get_transcription(self, transcription_id: int) -> Optional[dict]:
+    def save_transcriptions_bulk(self, results: List[dict], durable: bool = False) -> List[int]:
+        """
+        Save several transcriptions in one transaction (one commit, one fsync).
+        Publishes a TRANSCRIPTION_SAVED event per row once the transaction has committed.
+        Args:
+            results (List[dict]): Transcriber results with "text", "segments" and optional "audio_path"
+            durable (bool): Commit with synchronous=FULL, so the rows survive a power loss
+                once this returns (NORMAL only guarantees that across application crashes)
+        Returns:
+            List[int]: The ID of each saved transcription, in order; -1 for invalid
+                results, and for every result if the transaction failed
+        """
+        import datetime
+        ids = [-1] * len(results)
+        valid = []
+        for index, result in enumerate(results):
+            try:
+                self._validate(result.get("text"), result.get("segments", []))
+                valid.append(index)
+            except ValueError as e:
+                Logger().error(f"Skipping transcription for {result.get('audio_path')}: {e}")
+        if not valid:
+            return ids
+        timestamp = datetime.datetime.now().isoformat()
+        try:
+            with self._get_connection() as conn:
+                if durable:
+                    conn.execute("PRAGMA synchronous=FULL")
+                try:
+                    cursor = conn.cursor()
+                    for index in valid:
+                        result = results[index]
+                        ids[index] = self._insert(cursor, timestamp, result["text"], result.get("segments", []),
+                                                  result.get("audio_path"))
+                    conn.commit()
+                finally:
+                    if durable:
+                        conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as e:
+            Logger().error(f"Failed to save {len(valid)} transcriptions: {e}")
+            return [-1] * len(results)
+        for index in valid:
+            self._event_bus.publish(EventType.TRANSCRIPTION_SAVED, {
+                "id": ids[index],
+                "timestamp": timestamp,
+                "text": results[index]["text"]
+            })
+        return ids
+
+    def enqueue_save(self, result: dict, on_saved: Optional[Callable[[int, dict], None]] = None):
+        """
+        Queue a transcriber result for the write-behind thread, which saves everything
+        that arrives within `write_behind_window` seconds in one durable transaction.
+        Args:
+            result (dict): Transcriber result with "text", "segments" and optional "audio_path"
+            on_saved (Optional[Callable[[int, dict], None]]): Called from the writer thread with
+                the new ID (-1 on failure) and the result, only after the row is durable
+        """
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._write_behind_loop,
+                                                       name="storage-write-behind", daemon=True)
+                self._writer_thread.start()
+        self._save_queue.put((result, on_saved))
+
+    def flush(self):
+        """Block until every queued save has been written and its callback has run."""
+        self._save_queue.join()
+
+    def _write_behind_loop(self):
+        stopping = False
+        while not stopping:
+            item = self._save_queue.get()
+            if item is None:
+                self._save_queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._write_behind_window
+            while len(batch) < self._write_behind_max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._save_queue.get(timeout=remaining) if remaining > 0 else self._save_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._save_queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            ids = self.save_transcriptions_bulk([result for result, _ in batch], durable=True)
+            for transcription_id, (result, on_saved) in zip(ids, batch):
+                if on_saved is not None:
+                    try:
+                        on_saved(transcription_id, result)
+                    except Exception as e:
+                        Logger().error(f"Error in save callback: {e}")
+                self._save_queue.task_done()
+
+    def get_transcription(self, transcription_id: int, include_segments: bool = True) -> Optional[dict]:
         """
         Retrieve a transcription by its ID.
         Args:
             transcription_id (int): The transcription's ID
+            include_segments (bool): Decode and include segments_metadata
         Returns:
             dict or None: Transcription data if found, else None
         """
-        import json
+        columns = _HISTORY_COLUMNS_WITH_SEGMENTS if include_segments else _HISTORY_COLUMNS
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT {columns} FROM transcriptions WHERE id = ?", (transcription_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                return _row_to_dict(row)
+        except Exception as e:
+            Logger().error(f"Failed to get transcription: {e}")
+            return None
+
+    def get_segments(self, transcription_id: int) -> Optional[list]:
+        """
+        Retrieve only the segments of a transcription.
+        Args:
+            transcription_id (int): The transcription's ID
+        Returns:
+            list or None: Segment dicts if the transcription exists, else None
+        """
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    """
-                    SELECT id, timestamp, text, segments_metadata, audio_path
-                    FROM transcriptions
-                    WHERE id = ?
-                    """,
+                    "SELECT segments_metadata, segments_blob FROM transcriptions WHERE id = ?",
                     (transcription_id,)
                 )
                 row = cursor.fetchone()
                 if not row:
                     return None
-                return {
-                    "id": row[0],
-                    "timestamp": row[1],
-                    "text": row[2],
-                    "segments_metadata": json.loads(row[3]),
-                    "audio_path": row[4]
-                }
+                return _decode_segments(row[0], row[1])
         except Exception as e:
-            Logger().error(f"Failed to get transcription: {e}")
+            Logger().error(f"Failed to get segments: {e}")
             return None
 
-    def get_recent_transcriptions(self, limit: int = 10) -> list:
+    def get_recent_transcriptions(self, limit: int = 10, include_segments: bool = False) -> list:
         """
         Retrieve the most recent transcriptions.
         Args:
             limit (int): Number of transcriptions to return
+            include_segments (bool): Decode and include segments_metadata
         Returns:
             list: List of transcription dicts
         """
-        import json
+        return self.get_transcriptions_before(None, limit, include_segments)
+
+    def get_transcriptions_before(self, cursor: Optional[int], limit: int = 10, include_segments: bool = False,
+                                  text_chars: Optional[int] = None) -> list:
+        """
+        Retrieve one page of history, newest first, using keyset pagination: pass the id of
+        the last transcription of the previous page as `cursor` to get the next page.
+        Cost is proportional to `limit`, however deep the page is.
+        Args:
+            cursor (Optional[int]): Only return transcriptions with an id below this; None starts at the newest
+            limit (int): Maximum number of transcriptions to return
+            include_segments (bool): Decode and include segments_metadata; history lists
+                normally leave this off and call get_segments() for the row that is opened
+            text_chars (Optional[int]): Truncate text to this many characters, enough for a
+                preview, so long transcripts are not read into memory just to be listed
+        Returns:
+            list: List of transcription dicts
+        """
+        columns = _HISTORY_COLUMNS_WITH_SEGMENTS if include_segments else _HISTORY_COLUMNS
+        if text_chars is not None:
+            columns = columns.replace("text", f"substr(text, 1, {int(text_chars)})", 1)
+        try:
+            with self._get_connection() as conn:
+                db_cursor = conn.cursor()
+                # id is the rowid and grows with insertion time, so this walks the table's
+                # own b-tree backwards instead of sorting on timestamp
+                db_cursor.execute(
+                    f"""
+                    SELECT {columns}
+                    FROM transcriptions
+                    WHERE id < ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    (cursor if cursor is not None else _MAX_ROWID, limit)
+                )
+                return [_row_to_dict(row) for row in db_cursor.fetchall()]
+        except Exception as e:
+            Logger().error(f"Failed to get transcriptions: {e}")
+            return []
+
+    def find_unsaved_audio_paths(self, audio_paths: List[str]) -> List[str]:
+        """
+        Return the paths, in the given order, that no transcription references.
+        Args:
+            audio_paths (List[str]): Candidate audio file paths
+        Returns:
+            List[str]: Paths without a saved transcription
+        Raises:
+            RuntimeError: On database errors
+        """
+        saved = set()
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                # Stay well under SQLite's bound-parameter limit
+                for i in range(0, len(audio_paths), 500):
+                    chunk = audio_paths[i:i + 500]
+                    cursor.execute(
+                        f"SELECT audio_path FROM transcriptions WHERE audio_path IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    saved.update(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            raise RuntimeError(f"Failed to look up audio paths: {e}")
+        return [path for path in audio_paths if path not in saved]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> list:
+        """
+        Full-text search over transcription text, best matches first (bm25).
+        Args:
+            query (str): Words to look for; the last word also matches as a prefix
+            limit (int): Maximum number of results
+            offset (int): Number of results to skip
+        Returns:
+            list: Dicts with id, timestamp, text, snippet (matches wrapped in [ ]) and rank
+        """
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return []
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     """
-                    SELECT id, timestamp, text, segments_metadata, audio_path
-                    FROM transcriptions
-                    ORDER BY timestamp DESC
-                    LIMIT ?
+                    SELECT t.id, t.timestamp, t.text,
+                           snippet(transcriptions_fts, 0, '[', ']', '...', 12), transcriptions_fts.rank
+                    FROM transcriptions_fts
+                    JOIN transcriptions AS t ON t.id = transcriptions_fts.rowid
+                    WHERE transcriptions_fts MATCH ?
+                    ORDER BY transcriptions_fts.rank
+                    LIMIT ? OFFSET ?
                     """,
-                    (limit,)
+                    (fts_query, limit, offset)
                 )
-                rows = cursor.fetchall()
                 return [
                     {
                         "id": row[0],
                         "timestamp": row[1],
                         "text": row[2],
-                        "segments_metadata": json.loads(row[3]),
-                        "audio_path": row[4]
+                        "snippet": row[3],
+                        "rank": row[4]
                     }
-                    for row in rows
+                    for row in cursor.fetchall()
                 ]
         except Exception as e:
-            Logger().error(f"Failed to get recent transcriptions: {e}")
+            Logger().error(f"Failed to search transcriptions: {e}")
             return []
 
     def update_transcription(self, transcription_id: int, text: Optional[str] = None, segments_metadata: Optional[list] = None, audio_path: Optional[str] = None) -> bool:
         """
-        Update an existing transcription's fields. Publishes TRANSCRIPTION_COMPLETED event on success.
+        Update an existing transcription's fields. Publishes TRANSCRIPTION_SAVED event on success.
         Args:
             transcription_id (int): The ID of the transcription to update
             text (Optional[str]): New transcription text
@@ -165,7 +519,6 @@ class StorageManager:
         Raises:
             RuntimeError: On database errors
         """
-        import json
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
@@ -175,8 +528,11 @@ class StorageManager:
                     fields.append("text = ?")
                     values.append(text)
                 if segments_metadata is not None:
+                    segments_json, segments_blob = _encode_segments(segments_metadata)
                     fields.append("segments_metadata = ?")
-                    values.append(json.dumps(segments_metadata))
+                    values.append(segments_json)
+                    fields.append("segments_blob = ?")
+                    values.append(segments_blob)
                 if audio_path is not None:
                     fields.append("audio_path = ?")
                     values.append(audio_path)
@@ -188,15 +544,15 @@ class StorageManager:
                 if cursor.rowcount == 0:
                     return False
                 conn.commit()
-                # Publish event (no specific update event, use COMPLETED)
-                self._event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, {"id": transcription_id})
+                # Publish event; "text" is None when it was not changed
+                self._event_bus.publish(EventType.TRANSCRIPTION_SAVED, {"id": transcription_id, "text": text})
                 return True
         except Exception as e:
             raise RuntimeError(f"Failed to update transcription: {e}")
 
     def delete_transcription(self, transcription_id: int) -> bool:
         """
-        Delete a transcription from the database. Publishes TRANSCRIPTION_COMPLETED event on success.
+        Delete a transcription from the database. Publishes TRANSCRIPTION_DELETED event on success.
         Args:
             transcription_id (int): The ID of the transcription to delete
         Returns:
@@ -211,8 +567,8 @@ class StorageManager:
                 if cursor.rowcount == 0:
                     return False
                 conn.commit()
-                # Publish event (no specific delete event, use COMPLETED)
-                self._event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, {"id": transcription_id})
+                # Publish event
+                self._event_bus.publish(EventType.TRANSCRIPTION_DELETED, {"id": transcription_id})
                 return True
         except Exception as e:
             raise RuntimeError(f"Failed to delete transcription: {e}")
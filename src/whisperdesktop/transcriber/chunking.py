@@ -0,0 +1,35 @@
+# src/transcriber/chunking.py
+"""
+Splitting long recordings at pauses into chunks that can be decoded independently
+and in parallel.
+"""
+
+from typing import List, Tuple
+
+# Pauses at least this long are candidate cut points; Whisper loses no context across them
+CHUNK_MIN_SILENCE_MS = 500
+
+
+def split_at_silences(speech: List[dict], total_samples: int, target_samples: int) -> List[Tuple[int, int]]:
+    """
+    Cut a recording into consecutive chunks of about `target_samples`.
+    Args:
+        speech (List[dict]): Speech regions as {"start", "end"} sample indexes, in order,
+            as returned by faster-whisper's get_speech_timestamps()
+        total_samples (int): Length of the recording
+        target_samples (int): Preferred chunk length; a chunk only exceeds it when a
+            single speech region is longer
+    Returns:
+        List[Tuple[int, int]]: (start, end) sample ranges covering the whole recording.
+            Cuts fall in the middle of the pause between two speech regions, never
+            inside speech.
+    """
+    chunks = []
+    chunk_start = 0
+    for previous, following in zip(speech, speech[1:]):
+        if following["end"] - chunk_start > target_samples:
+            cut = (previous["end"] + following["start"]) // 2
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    chunks.append((chunk_start, total_samples))
+    return chunks
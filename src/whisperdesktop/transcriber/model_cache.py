@@ -0,0 +1,69 @@
+# src/transcriber/model_cache.py
+"""
+Persistent cache of resolved local model directories, so worker startup loads
+the model from disk without asking the Hugging Face hub whether it changed.
+"""
+
+import json
+import os
+import threading
+from typing import Optional
+from whisperdesktop.utils.logger import Logger
+
+logger = Logger()
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".transcription_tool_models.json")
+_cache_lock = threading.Lock()
+
+
+def _is_model_dir(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(os.path.join(path, "model.bin"))
+
+
+def _load_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable model cache {cache_path}: {e}")
+        return {}
+
+
+def _save_cache(cache_path: str, cache: dict):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=4)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Failed to save model cache {cache_path}: {e}")
+
+
+def resolve_model_path(model_size: str, cache_path: Optional[str] = None) -> str:
+    """
+    Return a local directory for `model_size`, downloading it only if it is not on disk.
+    Args:
+        model_size (str): Model name ("base", "small", ...) or a local model directory
+        cache_path (Optional[str]): JSON file mapping model names to directories
+    Returns:
+        str: Path to pass to WhisperModel
+    """
+    if os.path.isdir(model_size):
+        return model_size
+    cache_path = cache_path or DEFAULT_CACHE_PATH
+    with _cache_lock:
+        cache = _load_cache(cache_path)
+        cached = cache.get(model_size)
+        if _is_model_dir(cached):
+            return cached
+        from faster_whisper.utils import download_model
+        try:
+            path = download_model(model_size, local_files_only=True)
+        except Exception:
+            logger.info(f"Model {model_size} not found locally, downloading")
+            path = download_model(model_size)
+        cache[model_size] = path
+        _save_cache(cache_path, cache)
+        return path
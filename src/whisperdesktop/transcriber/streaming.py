@@ -0,0 +1,112 @@
+# src/transcriber/streaming.py
+"""
+Streaming transcription support: the recorder sends PCM chunks while the user is
+still talking and the worker transcribes VAD-delimited windows incrementally.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+from whisperdesktop.utils.audio import pcm16_to_float32, resample, frame_rms
+
+# Message types put on the transcription queue by a streaming Recorder
+STREAM_START = "stream_start"
+STREAM_CHUNK = "stream_chunk"
+STREAM_END = "stream_end"
+STREAM_MESSAGE_TYPES = (STREAM_START, STREAM_CHUNK, STREAM_END)
+
+
+def is_stream_message(item) -> bool:
+    return isinstance(item, dict) and item.get("type") in STREAM_MESSAGE_TYPES
+
+
+class StreamingSession:
+    """
+    Accumulates PCM chunks for one recording and cuts them into windows at pauses.
+
+    A window is released once it is at least `min_window_s` long and ends in
+    `silence_s` of low energy, or forcibly at the quietest point once it grows past
+    `max_window_s`. Windows are returned as 16 kHz float32 arrays together with
+    their offset (seconds) from the start of the recording.
+    """
+    def __init__(self, stream_id: str, sample_rate: int, channels: int = 1,
+                 min_window_s: float = 2.0, max_window_s: float = 15.0,
+                 silence_s: float = 0.4, energy_threshold: float = 0.01):
+        self.stream_id = stream_id
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.energy_threshold = energy_threshold
+        self._min_samples = int(min_window_s * sample_rate)
+        self._max_samples = int(max_window_s * sample_rate)
+        self._silence_samples = int(silence_s * sample_rate)
+        self._frame_size = max(1, int(0.03 * sample_rate))
+        self._chunks: List[np.ndarray] = []
+        self._pending = 0
+        self._offset_samples = 0
+        self.text_parts: List[str] = []
+        self.segments: List[dict] = []
+        self.info = None
+
+    def append(self, pcm) -> None:
+        audio = pcm16_to_float32(pcm, self.channels)
+        if len(audio):
+            self._chunks.append(audio)
+            self._pending += len(audio)
+
+    def pop_window(self) -> Optional[Tuple[float, np.ndarray]]:
+        """Return the next complete window, or None if more audio is needed."""
+        while self._pending >= self._min_samples:
+            tail = self._tail(self._silence_samples)
+            if frame_rms(tail, self._frame_size).max(initial=0.0) < self.energy_threshold:
+                window = self._take(self._pending)
+            elif self._pending >= self._max_samples:
+                audio = self._joined()
+                rms = frame_rms(audio, self._frame_size)
+                half = len(rms) // 2
+                cut = (half + int(np.argmin(rms[half:]))) * self._frame_size + self._frame_size // 2
+                window = self._take(cut)
+            else:
+                return None
+            if window is not None:
+                return window
+        return None
+
+    def flush(self) -> Optional[Tuple[float, np.ndarray]]:
+        """Return whatever audio is left once the recording has ended."""
+        if self._pending == 0:
+            return None
+        return self._take(self._pending)
+
+    def add_segments(self, segments: List[dict]) -> None:
+        self.segments.extend(segments)
+        self.text_parts.extend(segment["text"] for segment in segments)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts).strip()
+
+    def _joined(self) -> np.ndarray:
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0]
+
+    def _tail(self, n: int) -> np.ndarray:
+        parts = []
+        remaining = n
+        for chunk in reversed(self._chunks):
+            parts.append(chunk[-remaining:])
+            remaining -= len(parts[-1])
+            if remaining <= 0:
+                break
+        return np.concatenate(parts[::-1]) if parts else np.zeros(0, dtype=np.float32)
+
+    def _take(self, n: int) -> Optional[Tuple[float, np.ndarray]]:
+        audio = self._joined()
+        window, rest = audio[:n], audio[n:]
+        self._chunks = [rest] if len(rest) else []
+        self._pending = len(rest)
+        offset = self._offset_samples / self.sample_rate
+        self._offset_samples += len(window)
+        # Pure silence is dropped here instead of being handed to the model
+        if frame_rms(window, self._frame_size).max(initial=0.0) < self.energy_threshold:
+            return None
+        return offset, resample(window, self.sample_rate)
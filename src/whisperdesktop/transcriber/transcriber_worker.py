@@ -4,18 +4,36 @@ TranscriberWorker module for background audio transcription using Faster-Whisper
 """
 
 import multiprocessing
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import numpy as np
 from typing import Optional, Dict, Any
 from whisperdesktop.event_bus.event_bus import EventBus, EventType
 from whisperdesktop.utils.logger import Logger
-from faster_whisper import WhisperModel
+from whisperdesktop.utils.audio import pcm16_to_float32, resample, wav_duration, WHISPER_SAMPLE_RATE
+from whisperdesktop.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+from whisperdesktop.transcriber.model_cache import resolve_model_path
+from whisperdesktop.transcriber.chunking import split_at_silences, CHUNK_MIN_SILENCE_MS
+from whisperdesktop.transcriber.streaming import (
+    StreamingSession, is_stream_message, STREAM_START, STREAM_CHUNK, STREAM_END
+)
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
 logger = Logger("transcriber_worker")
 
+# Put on the ready queue when a worker can take another job (see TranscriberPool)
+WORKER_READY = "worker_ready"
+
 class TranscriberWorker(multiprocessing.Process):
     """Background worker for audio transcription."""
     def __init__(self, model_size="tiny", device="cpu", compute_type="int8", 
-                 vad_filter=True, vad_threshold=2.0, use_batched=False, batch_size=8, max_loops=None,
-                 event_bus=None, transcription_queue=None, result_queue=None):
+                 vad_filter=True, vad_threshold=2.0, use_batched=False, batch_size=8, batched_min_duration=30.0, max_loops=None,
+                 event_bus=None, transcription_queue=None, result_queue=None,
+                 cpu_threads=0, num_workers=1, worker_id=None, ready_queue=None, event_bridge=None,
+                 parallel_chunks=0, chunk_seconds=30.0, chunked_min_duration=60.0):
         super().__init__()
         self.model_size = model_size
         self.device = device
@@ -24,75 +42,368 @@ class TranscriberWorker(multiprocessing.Process):
         self.vad_threshold = vad_threshold
         self.use_batched = use_batched
         self.batch_size = batch_size
+        self.batched_min_duration = batched_min_duration
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.worker_id = worker_id
+        # Recordings longer than chunked_min_duration are cut at pauses into chunks of
+        # about chunk_seconds, decoded by parallel_chunks threads (0 or 1: off)
+        self.parallel_chunks = parallel_chunks
+        self.chunk_seconds = chunk_seconds
+        self.chunked_min_duration = chunked_min_duration
         self.daemon = True
         self._stop_event = multiprocessing.Event()
         self._max_loops = max_loops
         self._event_bus = event_bus
         self._transcription_queue = transcription_queue
         self._result_queue = result_queue
+        self._ready_queue = ready_queue
+        self._event_bridge = event_bridge
+        self._sessions: Dict[str, StreamingSession] = {}
+        self._shared_buffers: Dict[str, SharedPCMRingBuffer] = {}
+        self._batched_model = None
+        # Cold-start bookkeeping: set in the parent, read in the worker process
+        self._created_at = time.time()
+        self._first_result_sent = False
 
     def run(self):
         event_bus = self._event_bus if self._event_bus is not None else EventBus()
         transcription_queue = self._transcription_queue if self._transcription_queue is not None else event_bus.get_queue('transcription')
         result_queue = self._result_queue if self._result_queue is not None else event_bus.get_queue('result')
+        if self._event_bridge is not None:
+            # Events published in this process are re-published in the main process
+            self._event_bridge.start()
+            event_bus.forward_to(self._event_bridge.send)
+        try:
+            self._serve(event_bus, transcription_queue, result_queue)
+        finally:
+            if self._event_bridge is not None:
+                self._event_bridge.close()
+
+    def _serve(self, event_bus, transcription_queue, result_queue):
         try:
+            load_start = time.time()
+            cpu_threads, num_workers = self.cpu_threads, self.num_workers
+            if self.parallel_chunks > 1:
+                # One model worker per chunk thread, sharing this process's cores between them
+                num_workers = max(num_workers, self.parallel_chunks)
+                if cpu_threads:
+                    cpu_threads = max(1, cpu_threads // self.parallel_chunks)
             model = WhisperModel(
-                self.model_size,
+                resolve_model_path(self.model_size),
                 device=self.device,
-                compute_type=self.compute_type
+                compute_type=self.compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers
             )
-            if self.use_batched and self.device != "cpu":
-                from faster_whisper.transcribe import BatchedInferencePipeline
-                model = BatchedInferencePipeline(model, batch_size=self.batch_size)
-            logger.info(f"TranscriberWorker started with model={self.model_size}, device={self.device}, compute_type={self.compute_type}")
+            if self.use_batched:
+                # Works on CPU too: VAD chunks of one recording are decoded as a batch
+                self._batched_model = BatchedInferencePipeline(model)
+            load_seconds = time.time() - load_start
+            logger.info(f"TranscriberWorker started with model={self.model_size}, device={self.device}, compute_type={self.compute_type}, cpu_threads={self.cpu_threads}")
         except Exception as e:
             logger.error(f"Failed to initialize WhisperModel: {e}")
             return
+        warmup_seconds = self._warm_up(model)
+        model_info = {
+            "worker_id": self.worker_id,
+            "model": self.model_size,
+            "load_seconds": load_seconds,
+            "warmup_seconds": warmup_seconds,
+            "startup_seconds": time.time() - self._created_at
+        }
+        logger.info(f"Model ready in {model_info['startup_seconds']:.2f}s (load {load_seconds:.2f}s, warm-up {warmup_seconds:.2f}s)")
+        event_bus.publish(EventType.MODEL_READY, model_info)
+        self._announce_ready(model_info)
         loop_count = 0
         while not self._stop_event.is_set():
             if self._max_loops is not None and loop_count >= self._max_loops:
                 break
             loop_count += 1
             try:
-                audio_path = transcription_queue.get(timeout=1.0)
-                if audio_path is None:
+                job = transcription_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if job is None:
+                # Shutdown sentinel
+                break
+            # A streaming session keeps this worker busy until its end marker arrives
+            finishes_job = not is_stream_message(job) or job["type"] == STREAM_END
+            error = None
+            try:
+                if is_stream_message(job):
+                    self._handle_stream_message(model, job, result_queue, event_bus)
                     continue
+                audio_path, audio = self._resolve_job(job)
                 logger.info(f"Transcribing file: {audio_path}")
                 event_bus.publish(EventType.TRANSCRIPTION_REQUESTED, audio_path)
-                segments, info = model.transcribe(
-                    audio_path,
-                    vad_filter=self.vad_filter,
-                    vad_parameters={"min_silence_duration_ms": self.vad_threshold * 1000}
+                segments_data, info = self._transcribe(
+                    model, audio, job=job, on_segment=self._segment_publisher(event_bus, audio_path)
                 )
-                text = ""
-                segments_data = []
-                for segment in segments:
-                    text += segment.text + " "
-                    segments_data.append({
-                        "id": segment.id,
-                        "start": segment.start,
-                        "end": segment.end,
-                        "text": segment.text
-                    })
                 result = {
                     "audio_path": audio_path,
-                    "text": text.strip(),
+                    "text": "".join(segment["text"] for segment in segments_data).strip(),
                     "segments": segments_data,
                     "language": info.language,
                     "language_probability": info.language_probability
                 }
-                result_queue.put(result)
+                if isinstance(job, dict) and "job_id" in job:
+                    # Lets the main process mark the durable job done once the result is saved
+                    result["job_id"] = job["job_id"]
+                self._put_result(result_queue, result)
                 logger.info(f"Transcription complete for: {audio_path}")
-                event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, result)
+                self._publish_completed(event_bus, result)
             except Exception as e:
                 logger.error(f"Error in transcriber worker: {e}")
+                error = str(e) or type(e).__name__
+            finally:
+                if finishes_job:
+                    self._announce_ready(error=error)
+
+    def _announce_ready(self, model_info=None, error=None):
+        if self._ready_queue is not None:
+            message = {"type": WORKER_READY, "worker_id": self.worker_id}
+            if model_info is not None:
+                message["model_info"] = model_info
+            if error is not None:
+                # Lets the pool retry or fail the job this worker just gave up on
+                message["error"] = error
+            self._ready_queue.put(message)
+
+    def _warm_up(self, model) -> float:
+        """Decode a second of faint noise so the first real job does not pay for allocation."""
+        start = time.time()
+        try:
+            audio = np.random.default_rng(0).normal(0.0, 0.01, WHISPER_SAMPLE_RATE).astype(np.float32)
+            segments, _ = model.transcribe(audio, vad_filter=False, beam_size=1)
+            for _ in segments:
+                pass
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+        return time.time() - start
+
+    def _publish_completed(self, event_bus, result):
+        # The full result travels on the result queue; the event only carries what
+        # subscribers such as the clipboard need
+        event_bus.publish(EventType.TRANSCRIPTION_COMPLETED, {
+            "audio_path": result["audio_path"],
+            "text": result["text"],
+            "language": result.get("language")
+        })
+
+    @staticmethod
+    def _segment_publisher(event_bus, audio_path):
+        """Callback publishing each segment as it is decoded, so the UI can show text before the job ends."""
+        def publish(segment):
+            # Only the new segment: the event bridge batches these without coalescing them
+            event_bus.publish(EventType.TRANSCRIPTION_SEGMENT, dict(segment, audio_path=audio_path))
+        return publish
+
+    def _put_result(self, result_queue, result):
+        # Stamped so the main process can measure queue-to-UI latency
+        result["enqueued_at"] = time.time()
+        if not self._first_result_sent:
+            result["cold_start_seconds"] = time.time() - self._created_at
+            self._first_result_sent = True
+        result_queue.put(result)
+
+    def _resolve_job(self, job):
+        """
+        Return (audio_path, audio) for a queued job. Jobs are either a file path or a dict
+        with an `audio_path` and optionally a `pcm` reference into the recorder's shared
+        memory buffer, in which case the audio is handed to the model as an array and the
+        WAV is only read if the shared frames are no longer available.
+        """
+        if not isinstance(job, dict):
+            return job, job
+        audio_path = job["audio_path"]
+        pcm = job.get("pcm")
+        if pcm:
+            audio = self._read_shared_pcm(pcm)
+            if audio is not None:
+                return audio_path, audio
+            logger.warning(f"Shared PCM unavailable, falling back to file: {audio_path}")
+        return audio_path, audio_path
+
+    def _read_shared_pcm(self, pcm):
+        try:
+            buffer = self._shared_buffers.get(pcm["name"])
+            if buffer is None:
+                buffer = SharedPCMRingBuffer.attach(pcm["name"])
+                self._shared_buffers[pcm["name"]] = buffer
+            samples = buffer.read(pcm["start"], pcm["end"])
+        except Exception as e:
+            logger.error(f"Failed to read shared PCM buffer {pcm.get('name')}: {e}")
+            return None
+        if samples is None:
+            return None
+        return resample(pcm16_to_float32(samples, pcm["channels"]), pcm["sample_rate"])
+
+    def _use_batched(self, audio, job=None) -> bool:
+        """
+        Batched decoding pays off for long recordings and while a backlog is queued
+        (the pool marks such jobs). It needs VAD to split the audio into chunks.
+        """
+        if self._batched_model is None or not self.vad_filter:
+            return False
+        if isinstance(job, dict) and job.get("batched"):
+            return True
+        duration = len(audio) / WHISPER_SAMPLE_RATE if not isinstance(audio, str) else wav_duration(audio)
+        return duration >= self.batched_min_duration
+
+    def _use_chunks(self, audio) -> bool:
+        if self.parallel_chunks <= 1:
+            return False
+        duration = len(audio) / WHISPER_SAMPLE_RATE if not isinstance(audio, str) else wav_duration(audio)
+        return duration >= self.chunked_min_duration
+
+    def _transcribe(self, model, audio, offset=0.0, job=None, on_segment=None):
+        """
+        Run the model on a path or 16 kHz float32 array; segment times are shifted by `offset`.
+        `on_segment` is called with each segment dict, in order, as soon as it is decoded.
+        """
+        vad_parameters = {"min_silence_duration_ms": self.vad_threshold * 1000}
+        if self._use_batched(audio, job):
+            segments, info = self._batched_model.transcribe(
+                audio,
+                vad_filter=True,
+                vad_parameters=vad_parameters,
+                batch_size=self.batch_size
+            )
+        elif self._use_chunks(audio):
+            return self._transcribe_chunked(model, audio, vad_parameters, on_segment)
+        else:
+            segments, info = model.transcribe(
+                audio,
+                vad_filter=self.vad_filter,
+                vad_parameters=vad_parameters
+            )
+        return self._collect_segments(segments, offset, on_segment), info
+
+    @staticmethod
+    def _collect_segments(segments, offset=0.0, on_segment=None):
+        # `segments` is faster-whisper's lazy generator: each iteration decodes the next segment
+        segments_data = []
+        for segment in segments:
+            segment_data = {
+                "id": segment.id,
+                "start": segment.start + offset,
+                "end": segment.end + offset,
+                "text": segment.text
+            }
+            segments_data.append(segment_data)
+            if on_segment is not None:
+                on_segment(segment_data)
+        return segments_data
+
+    def _transcribe_chunked(self, model, audio, vad_parameters, on_segment=None):
+        """
+        Cut a long recording at pauses and decode the chunks concurrently. The model's
+        workers release the GIL, so the threads run in parallel. The language is detected
+        once up front so every chunk is decoded in the same language, and segment times
+        are shifted back onto the recording's timeline.
+        """
+        if isinstance(audio, str):
+            audio = decode_audio(audio, sampling_rate=WHISPER_SAMPLE_RATE)
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=CHUNK_MIN_SILENCE_MS))
+        chunks = split_at_silences(speech, len(audio), int(self.chunk_seconds * WHISPER_SAMPLE_RATE))
+        language, language_probability = self._detect_language(model, audio, speech)
+        logger.info(f"Decoding {len(audio) / WHISPER_SAMPLE_RATE:.0f}s of audio as {len(chunks)} chunk(s) "
+                    f"on {self.parallel_chunks} thread(s)")
+
+        def decode(chunk):
+            start, end = chunk
+            segments, _ = model.transcribe(
+                audio[start:end],
+                language=language,
+                vad_filter=self.vad_filter,
+                vad_parameters=vad_parameters
+            )
+            # The generator does the decoding, so it is consumed on this thread
+            return self._collect_segments(segments, start / WHISPER_SAMPLE_RATE)
+
+        segments_data = []
+        with ThreadPoolExecutor(max_workers=self.parallel_chunks, thread_name_prefix="transcriber-chunk") as executor:
+            # Results come back in chunk order, so segments are reported in order as soon
+            # as every chunk before them is done
+            for segments in executor.map(decode, chunks):
+                for segment in segments:
+                    segment["id"] = len(segments_data) + 1
+                    segments_data.append(segment)
+                    if on_segment is not None:
+                        on_segment(segment)
+        return segments_data, SimpleNamespace(language=language, language_probability=language_probability)
+
+    @staticmethod
+    def _detect_language(model, audio, speech):
+        """Detect the language on the first 30 s of speech."""
+        if not getattr(model.model, "is_multilingual", True):
+            return "en", 1.0
+        start = speech[0]["start"] if speech else 0
+        language, probability, _ = model.detect_language(audio[start:start + 30 * WHISPER_SAMPLE_RATE])
+        return language, probability
+
+    def _handle_stream_message(self, model, message, result_queue, event_bus):
+        """Feed one streaming message to its session, transcribing any windows that became ready."""
+        stream_id = message["stream_id"]
+        if message["type"] == STREAM_START:
+            self._sessions[stream_id] = StreamingSession(
+                stream_id,
+                sample_rate=message["sample_rate"],
+                channels=message.get("channels", 1)
+            )
+            event_bus.publish(EventType.TRANSCRIPTION_REQUESTED, stream_id)
+            return
+        session = self._sessions.get(stream_id)
+        if session is None:
+            logger.warning(f"Dropping streaming message for unknown stream: {stream_id}")
+            return
+        if message["type"] == STREAM_CHUNK:
+            session.append(message["pcm"])
+            window = session.pop_window()
+            while window is not None:
+                self._transcribe_window(model, session, window, result_queue, event_bus)
+                window = session.pop_window()
+        elif message["type"] == STREAM_END:
+            window = session.flush()
+            if window is not None:
+                self._transcribe_window(model, session, window, result_queue, event_bus)
+            del self._sessions[stream_id]
+            info = session.info
+            result = {
+                "audio_path": message.get("audio_path", stream_id),
+                "text": session.text,
+                "segments": session.segments,
+                "language": info.language if info else None,
+                "language_probability": info.language_probability if info else None,
+                "streamed": True
+            }
+            self._put_result(result_queue, result)
+            logger.info(f"Streaming transcription complete for: {stream_id}")
+            self._publish_completed(event_bus, result)
+
+    def _transcribe_window(self, model, session, window, result_queue, event_bus):
+        offset, audio = window
+        segments_data, info = self._transcribe(model, audio, offset=offset)
+        if session.info is None:
+            session.info = info
+        if not segments_data:
+            return
+        session.add_segments(segments_data)
+        # Self-contained (cumulative) payload, so the event bridge may coalesce updates
+        event_bus.publish(EventType.TRANSCRIPTION_PARTIAL, {
+            "audio_path": session.stream_id,
+            "text": session.text,
+            "segment_count": len(session.segments)
+        })
 
     def stop(self):
+        """Ask the worker to exit after its current job. Does not wait; see shutdown()."""
         self._stop_event.set()
 
     def shutdown(self, timeout=5):
-        """Signal the worker to stop and join the process."""
-        self._stop_event.set()
+        """Stop the worker and wait for it, terminating the process if it does not exit in time."""
+        self.stop()
         if self.is_alive():
             self.join(timeout=timeout)
             if self.is_alive():
@@ -0,0 +1,275 @@
+# src/transcriber/worker_pool.py
+"""
+TranscriberPool: runs several TranscriberWorker processes and feeds them from the
+shared transcription queue, shortest job first.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.audio import wav_duration
+from whisperdesktop.utils.metrics import Metrics
+from whisperdesktop.transcriber.transcriber_worker import TranscriberWorker, WORKER_READY
+from whisperdesktop.transcriber.streaming import is_stream_message, STREAM_START, STREAM_END
+
+logger = Logger()
+
+# Below this many cores per model, extra processes only fight over the same cores
+MIN_THREADS_PER_WORKER = 4
+# A worker that keeps dying (e.g. the model cannot be loaded) is given up on after this many restarts
+MAX_RESTARTS = 3
+
+
+def plan_workers(cpu_count: Optional[int] = None, num_workers: int = 0) -> Tuple[int, int]:
+    """
+    Split the machine's cores between model instances.
+    Args:
+        cpu_count (Optional[int]): Cores available, defaults to os.cpu_count()
+        num_workers (int): Number of worker processes, 0 to size automatically
+    Returns:
+        tuple: (number of worker processes, cpu_threads per WhisperModel)
+    """
+    cores = cpu_count or os.cpu_count() or 1
+    if num_workers <= 0:
+        num_workers = max(1, cores // MIN_THREADS_PER_WORKER)
+    num_workers = min(num_workers, cores)
+    return num_workers, max(1, cores // num_workers)
+
+
+def job_duration(job) -> float:
+    """Audio length of a queued job in seconds, read from the WAV header or the PCM reference."""
+    if isinstance(job, dict):
+        pcm = job.get("pcm")
+        if pcm:
+            return (pcm["end"] - pcm["start"]) / pcm["sample_rate"]
+        job = job.get("audio_path")
+    return wav_duration(job)
+
+
+class TranscriberPool:
+    """
+    Owns the TranscriberWorker processes and a dispatcher thread.
+
+    The dispatcher reads the shared transcription queue, orders file jobs by
+    (priority, audio duration) and hands each one to an idle worker; while a
+    backlog remains, jobs are flagged for batched decoding. Workers
+    report back on the same queue when they are free, so the dispatcher only
+    ever blocks on one queue. Streaming sessions are pinned to one worker from
+    their start marker to their end marker and take precedence over file jobs.
+
+    With a `job_queue` (JobQueue), file jobs are persisted instead of held in
+    memory: the dispatcher claims them from the database for idle workers and
+    retries the ones a worker gives up on. Each dispatched job carries its `job_id`
+    into the result, and the job is only marked done once that result is saved.
+    """
+    def __init__(self, num_workers: int = 0, cpu_count: Optional[int] = None,
+                 transcription_queue=None, result_queue=None, job_queue=None, **worker_kwargs):
+        self._num_workers, self._cpu_threads = plan_workers(cpu_count, num_workers)
+        self._inbox = transcription_queue if transcription_queue is not None else multiprocessing.Queue()
+        self._result_queue = result_queue
+        self._worker_kwargs = worker_kwargs
+        self._workers: List[TranscriberWorker] = []
+        self._worker_queues: List[multiprocessing.Queue] = []
+        self._restarts: Dict[int, int] = {}
+        self._idle = deque()
+        self._jobs = []
+        self._sequence = itertools.count()
+        self._stream_owners: Dict[str, int] = {}
+        self._pending_streams: Dict[str, list] = {}
+        self._job_queue = job_queue
+        # Durable job ID each worker is running (job_queue only)
+        self._running_jobs: Dict[int, int] = {}
+        self._stop_event = threading.Event()
+        self._dispatcher = None
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    @property
+    def cpu_threads(self) -> int:
+        return self._cpu_threads
+
+    def start(self):
+        if self._job_queue is not None:
+            recovered = self._job_queue.requeue_running()
+            if recovered:
+                logger.info(f"Re-queued {recovered} job(s) interrupted by the previous session")
+            self._job_queue.purge()
+        for worker_id in range(self._num_workers):
+            self._worker_queues.append(multiprocessing.Queue())
+            self._workers.append(self._spawn_worker(worker_id))
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="transcriber-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info(f"TranscriberPool started {self._num_workers} worker(s) with {self._cpu_threads} thread(s) each")
+
+    def _spawn_worker(self, worker_id: int) -> TranscriberWorker:
+        worker = TranscriberWorker(
+            transcription_queue=self._worker_queues[worker_id],
+            result_queue=self._result_queue,
+            cpu_threads=self._cpu_threads,
+            worker_id=worker_id,
+            ready_queue=self._inbox,
+            **self._worker_kwargs
+        )
+        worker.start()
+        return worker
+
+    def _dispatch_loop(self):
+        last_health_check = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                item = self._inbox.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            except Exception as e:
+                logger.error(f"Error reading transcription queue: {e}")
+                continue
+            try:
+                if item is not None:
+                    self._accept(item)
+                # Drain whatever else arrived so ordering decisions see the whole backlog
+                while True:
+                    try:
+                        self._accept(self._inbox.get_nowait())
+                    except queue.Empty:
+                        break
+                self._assign()
+                if self._job_queue is not None:
+                    self._job_queue.publish_metrics(changed_only=True)
+            except Exception as e:
+                logger.error(f"Error dispatching transcription job: {e}")
+            if time.monotonic() - last_health_check > 1.0:
+                last_health_check = time.monotonic()
+                self._restart_dead_workers()
+
+    def _accept(self, item):
+        if item is None:
+            return
+        if isinstance(item, dict) and item.get("type") == WORKER_READY:
+            self._finish_job(item["worker_id"], item.get("error"))
+            if item["worker_id"] not in self._idle:
+                self._idle.append(item["worker_id"])
+            if "model_info" in item:
+                self._model_ready(item["model_info"])
+        elif is_stream_message(item):
+            stream_id = item["stream_id"]
+            owner = self._stream_owners.get(stream_id)
+            if owner is not None:
+                self._worker_queues[owner].put(item)
+                if item["type"] == STREAM_END:
+                    del self._stream_owners[stream_id]
+            elif item["type"] == STREAM_START or stream_id in self._pending_streams:
+                self._pending_streams.setdefault(stream_id, []).append(item)
+            else:
+                logger.warning(f"Dropping streaming message for unknown stream: {stream_id}")
+        else:
+            priority = item.get("priority", 0) if isinstance(item, dict) else 0
+            if self._job_queue is not None:
+                self._job_queue.enqueue(item, priority, job_duration(item))
+            else:
+                heapq.heappush(self._jobs, (priority, job_duration(item), next(self._sequence), item))
+
+    def _finish_job(self, worker_id: int, error: Optional[str]):
+        # A finished job stays running until its result is saved (ApplicationController
+        # completes it then); only failures are recorded here
+        job_id = self._running_jobs.pop(worker_id, None)
+        if job_id is not None and error is not None:
+            self._job_queue.fail(job_id, error)
+
+    def _model_ready(self, model_info):
+        metrics = Metrics()
+        metrics.record("model_load_s", model_info["load_seconds"])
+        metrics.record("model_warmup_s", model_info["warmup_seconds"])
+        metrics.record("model_cold_start_s", model_info["startup_seconds"])
+
+    def _assign(self):
+        while self._idle and (self._pending_streams or self._jobs or self._job_queue is not None):
+            worker_id = self._idle.popleft()
+            if self._pending_streams:
+                stream_id = next(iter(self._pending_streams))
+                messages = self._pending_streams.pop(stream_id)
+                for message in messages:
+                    self._worker_queues[worker_id].put(message)
+                if messages[-1]["type"] != STREAM_END:
+                    self._stream_owners[stream_id] = worker_id
+            elif self._job_queue is not None:
+                claimed = self._job_queue.claim(worker_id)
+                if claimed is None:
+                    # Nothing runnable yet (empty, or only jobs waiting out a retry delay)
+                    self._idle.appendleft(worker_id)
+                    break
+                job_id, job = claimed
+                self._running_jobs[worker_id] = job_id
+                job = dict(job, job_id=job_id) if isinstance(job, dict) else {"audio_path": job, "job_id": job_id}
+                if self._job_queue.depth():
+                    job["batched"] = True
+                logger.debug(f"Dispatching job {job_id} to worker {worker_id}")
+                self._worker_queues[worker_id].put(job)
+            else:
+                _, duration, _, job = heapq.heappop(self._jobs)
+                if self._jobs:
+                    # A backlog is waiting: ask the worker for batched (higher throughput) decoding
+                    job = dict(job, batched=True) if isinstance(job, dict) else {"audio_path": job, "batched": True}
+                logger.debug(f"Dispatching {duration:.1f}s job to worker {worker_id}")
+                self._worker_queues[worker_id].put(job)
+
+    def _restart_dead_workers(self):
+        for worker_id, worker in enumerate(self._workers):
+            if not worker.is_alive() and not self._stop_event.is_set():
+                if self._restarts.get(worker_id, 0) >= MAX_RESTARTS:
+                    continue
+                self._restarts[worker_id] = self._restarts.get(worker_id, 0) + 1
+                logger.error(f"Transcriber worker {worker_id} exited (code {worker.exitcode}); restarting")
+                if worker_id in self._idle:
+                    self._idle.remove(worker_id)
+                self._finish_job(worker_id, f"worker exited with code {worker.exitcode}")
+                for stream_id in [s for s, owner in self._stream_owners.items() if owner == worker_id]:
+                    del self._stream_owners[stream_id]
+                self._workers[worker_id] = self._spawn_worker(worker_id)
+
+    def queue_depth(self) -> int:
+        """Number of file jobs waiting for a free worker."""
+        if self._job_queue is not None:
+            return self._job_queue.depth()
+        return len(self._jobs)
+
+    def is_alive(self) -> bool:
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop dispatching, let every worker finish its current job and exit, and
+        terminate any worker still running after `timeout` seconds.
+        """
+        self._stop_event.set()
+        self._inbox.put(None)  # wake the dispatcher
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=timeout)
+        for worker, worker_queue in zip(self._workers, self._worker_queues):
+            worker.stop()
+            worker_queue.put(None)
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()))
+        for worker in self._workers:
+            if worker.is_alive():
+                logger.warning(f"Terminating transcriber worker {worker.worker_id}")
+                worker.terminate()
+                worker.join(timeout=1.0)
+        if self._jobs:
+            logger.warning(f"TranscriberPool shut down with {len(self._jobs)} job(s) still queued")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
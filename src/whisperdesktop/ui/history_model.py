@@ -0,0 +1,146 @@
+# src/ui/history_model.py
+"""
+HistoryListModel: in-memory list of recent transcriptions for the history dropdown,
+updated incrementally from storage events instead of re-querying the database.
+PagedHistoryModel: the whole archive for the history window, fetched page by page.
+"""
+
+from typing import List, Optional
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from whisperdesktop.utils.logger import Logger
+
+PREVIEW_WORDS = 15
+# Characters of text read per row for previews (comfortably more than PREVIEW_WORDS words)
+PREVIEW_CHARS = 200
+
+
+def make_preview(text: str, words: int = PREVIEW_WORDS) -> str:
+    """First `words` words of `text`, with an ellipsis if it is longer."""
+    parts = text.split(None, words)
+    preview = ' '.join(parts[:words])
+    if len(parts) > words:
+        preview += '...'
+    return preview
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    Rows are dicts with id, timestamp and a precomputed display string; full text and
+    segments stay in the database. All methods must be called on the Qt thread.
+    """
+    IdRole = Qt.UserRole + 1
+
+    def __init__(self, capacity: Optional[int] = 10, parent=None):
+        super().__init__(parent)
+        self._capacity = capacity
+        self._rows: List[dict] = []
+
+    @staticmethod
+    def _make_row(transcription: dict) -> dict:
+        timestamp = transcription.get('timestamp', '')
+        # Search results come with a snippet around the matched words
+        preview = make_preview(transcription.get('snippet') or transcription.get('text', ''))
+        return {
+            "id": transcription.get('id'),
+            "timestamp": timestamp,
+            "display": f"{timestamp} - {preview}"
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return row["display"]
+        if role == self.IdRole:
+            return row["id"]
+        return None
+
+    def transcription_id(self, row: int) -> Optional[int]:
+        return self._rows[row]["id"] if 0 <= row < len(self._rows) else None
+
+    def set_transcriptions(self, transcriptions: List[dict]):
+        """Replace all rows, e.g. with the initial history page or search results."""
+        self.beginResetModel()
+        self._rows = [self._make_row(t) for t in transcriptions]
+        self.endResetModel()
+
+    def _find(self, transcription_id) -> int:
+        for row, entry in enumerate(self._rows):
+            if entry["id"] == transcription_id:
+                return row
+        return -1
+
+    def upsert(self, transcription: dict):
+        """
+        Insert a newly saved transcription at the top, or refresh the row of an updated one.
+        Payloads without text (e.g. an update that only touched segments) leave rows as they are.
+        """
+        if not transcription or transcription.get('text') is None:
+            return
+        row = self._find(transcription.get('id'))
+        if row >= 0:
+            entry = dict(transcription)
+            entry.setdefault('timestamp', self._rows[row]["timestamp"])
+            self._rows[row] = self._make_row(entry)
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, self._make_row(transcription))
+        self.endInsertRows()
+        if self._capacity is not None and len(self._rows) > self._capacity:
+            self.beginRemoveRows(QModelIndex(), self._capacity, len(self._rows) - 1)
+            del self._rows[self._capacity:]
+            self.endRemoveRows()
+
+    def remove(self, transcription_id):
+        row = self._find(transcription_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+
+class PagedHistoryModel(HistoryListModel):
+    """
+    History model for views over the whole archive. Views call fetchMore() as the user
+    scrolls, which loads the next keyset page of previews from storage; rows never hold
+    full text or segments, so memory grows with what was scrolled through, not with
+    the size of the archive.
+    """
+    def __init__(self, storage_manager, page_size: int = 100, parent=None):
+        super().__init__(capacity=None, parent=parent)
+        self._storage_manager = storage_manager
+        self._page_size = page_size
+        self._exhausted = False
+
+    def reload(self):
+        self._exhausted = False
+        self.set_transcriptions([])
+        self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        cursor = self._rows[-1]["id"] if self._rows else None
+        try:
+            page = self._storage_manager.get_transcriptions_before(cursor, self._page_size, text_chars=PREVIEW_CHARS)
+        except Exception as e:
+            Logger().error(f"Failed to load history page: {e}")
+            page = []
+        if len(page) < self._page_size:
+            self._exhausted = True
+        if not page:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(self._make_row(t) for t in page)
+        self.endInsertRows()
@@ -0,0 +1,93 @@
+# src/ui/result_dispatcher.py
+"""
+ResultDispatcher: delivers transcriber results to the Qt thread as soon as they
+are put on the result queue, without polling.
+"""
+
+import threading
+import time
+from typing import Callable
+from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal, pyqtSlot
+from whisperdesktop.utils.logger import Logger
+from whisperdesktop.utils.metrics import Metrics
+
+
+class ResultDispatcher(QObject):
+    """
+    Blocks on the multiprocessing result queue in a background thread and
+    re-emits each result through a Qt signal, so `handler` always runs on the
+    thread that owns this object (the Qt main thread).
+    """
+    _result_received = pyqtSignal(object)
+
+    def __init__(self, result_queue, handler: Callable[[dict], None], parent=None):
+        super().__init__(parent)
+        self._queue = result_queue
+        self._handler = handler
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="result-dispatcher", daemon=True)
+        self._result_received.connect(self._deliver)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                result = self._queue.get()
+            except (EOFError, OSError):
+                break
+            except Exception as e:
+                Logger().error(f"Error reading result queue: {e}")
+                continue
+            if result is None:
+                # Shutdown sentinel
+                break
+            self._result_received.emit(result)
+
+    @pyqtSlot(object)
+    def _deliver(self, result):
+        enqueued_at = result.get("enqueued_at") if isinstance(result, dict) else None
+        if enqueued_at is not None:
+            Metrics().record("result_queue_to_ui_ms", (time.time() - enqueued_at) * 1000.0)
+        try:
+            self._handler(result)
+        except Exception as e:
+            Logger().error(f"Error handling transcription result: {e}")
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Deliver every result already on the queue, then stop. Call from the Qt thread
+        once the producers have stopped; results are handled here even if the Qt event
+        loop has already exited.
+        """
+        # The sentinel goes behind the pending results, so the thread emits them all first
+        try:
+            self._queue.put(None)
+        except Exception:
+            pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._stopping.set()
+        # Run the deliveries the thread posted but the event loop has not processed. They
+        # are addressed to this object because _deliver is a declared slot.
+        QCoreApplication.sendPostedEvents(self)
+
+
+class EventMarshaller(QObject):
+    """
+    Re-publishes events on the Qt thread. Used as the EventBridge's deliver callback,
+    so subscribers of events coming from worker processes may touch widgets.
+    """
+    _event_received = pyqtSignal(object, object)
+
+    def __init__(self, event_bus, parent=None):
+        super().__init__(parent)
+        self._event_bus = event_bus
+        self._event_received.connect(self._republish)
+
+    def publish(self, event_type, payload=None):
+        self._event_received.emit(event_type, payload)
+
+    def _republish(self, event_type, payload):
+        self._event_bus.publish(event_type, payload)
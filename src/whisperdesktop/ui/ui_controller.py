@@ -1,22 +1,35 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDialog, QTextEdit, QApplication, QComboBox
-from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDialog, QTextEdit, QApplication, QComboBox, QLineEdit, QListView
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
 from enum import Enum
 from whisperdesktop.event_bus.event_bus import EventBus, EventType
 from whisperdesktop.storage.storage_manager import StorageManager
+from whisperdesktop.ui.history_model import HistoryListModel, PagedHistoryModel
 from whisperdesktop.utils.logger import Logger
 
 class UIStatus(Enum):
+    LOADING = "Loading model..."
     IDLE = "Ready"
     RECORDING = "Recording..."
     TRANSCRIBING = "Transcribing..."
     SAVED = "Saved!"
 
 class UIController(QMainWindow):
-    def __init__(self, event_bus=None):
+    # Emitted from the publishing thread, delivered on the Qt thread
+    _model_ready_signal = pyqtSignal(object)
+    _saved_signal = pyqtSignal(object)
+    _deleted_signal = pyqtSignal(object)
+    SEARCH_DEBOUNCE_MS = 150
+    HISTORY_SIZE = 10
+
+    def __init__(self, event_bus=None, storage_manager=None):
         super().__init__()
         self._event_bus = event_bus if event_bus is not None else EventBus()
-        self._storage_manager = StorageManager()
-        self._history_data = []
+        self._storage_manager = storage_manager if storage_manager is not None else StorageManager()
+        self._history_model = HistoryListModel(capacity=self.HISTORY_SIZE, parent=self)
+        self._history_window = None
+        # Recording whose segments are being shown, and the end of its text so far
+        self._live_audio_path = None
+        self._live_tail = ''
         # Set window properties
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
@@ -29,12 +42,10 @@ class UIController(QMainWindow):
         self._setup_ui()
         self._setup_event_handlers()
         # Status management
-        self.current_status = UIStatus.IDLE
+        self._model_ready = False
+        self.current_status = UIStatus.LOADING
         self._update_status()
-        # History refresh timer
-        self._history_timer = QTimer(self)
-        self._history_timer.timeout.connect(self._refresh_history)
-        self._history_timer.start(10000)  # 10 seconds
+        # History is loaded once, then kept current by TRANSCRIPTION_SAVED/DELETED events
         self._refresh_history()
 
     def _setup_ui(self):
@@ -50,6 +61,16 @@ class UIController(QMainWindow):
         self.ptt_button.setFixedSize(QSize(100, 30))
         button_layout.addWidget(self.ptt_button)
         self.main_layout.addLayout(button_layout)
+        # History search box; the query runs once typing pauses
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText('Search history...')
+        self.search_box.setClearButtonEnabled(True)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._refresh_history)
+        self.search_box.textChanged.connect(self._search_timer.start)
+        self.main_layout.addWidget(self.search_box)
         # History dropdown layout
         history_layout = QHBoxLayout()
         history_label = QLabel('History:')
@@ -57,8 +78,14 @@ class UIController(QMainWindow):
         history_layout.addWidget(history_label)
         self.history_dropdown = QComboBox()
         self.history_dropdown.setFixedWidth(200)
+        self.history_dropdown.setModel(self._history_model)
         self.history_dropdown.activated.connect(self._on_history_item_selected)
         history_layout.addWidget(self.history_dropdown)
+        # Opens the full, scrollable archive
+        self.browse_button = QPushButton('All...')
+        self.browse_button.setFixedSize(QSize(50, 24))
+        self.browse_button.clicked.connect(self._on_browse_history_clicked)
+        history_layout.addWidget(self.browse_button)
         self.main_layout.addLayout(history_layout)
         # Status label
         self.status_label = QLabel()
@@ -89,10 +116,23 @@ class UIController(QMainWindow):
         self.ptt_button.released.connect(self._on_ptt_released)
 
     def _setup_event_handlers(self):
+        self._model_ready_signal.connect(self._on_model_ready)
+        self._event_bus.subscribe(EventType.MODEL_READY, self._model_ready_signal.emit)
         self._event_bus.subscribe(EventType.RECORDING_STARTED, self._on_recording_started)
         self._event_bus.subscribe(EventType.RECORDING_STOPPED, self._on_recording_stopped)
         self._event_bus.subscribe(EventType.TRANSCRIPTION_REQUESTED, self._on_transcription_requested)
-        self._event_bus.subscribe(EventType.TRANSCRIPTION_COMPLETED, self._on_transcription_completed)
+        self._event_bus.subscribe(EventType.TRANSCRIPTION_PARTIAL, self._on_transcription_partial)
+        self._event_bus.subscribe(EventType.TRANSCRIPTION_SEGMENT, self._on_transcription_segment)
+        # Saves are published from the storage write-behind thread
+        self._saved_signal.connect(self._on_transcription_saved)
+        self._event_bus.subscribe(EventType.TRANSCRIPTION_SAVED, self._saved_signal.emit)
+        self._deleted_signal.connect(self._on_transcription_deleted)
+        self._event_bus.subscribe(EventType.TRANSCRIPTION_DELETED, self._deleted_signal.emit)
+
+    def _on_model_ready(self, data):
+        self._model_ready = True
+        if self.current_status == UIStatus.LOADING:
+            self.reset_status()
 
     def _on_recording_started(self, data):
         self.current_status = UIStatus.RECORDING
@@ -109,8 +149,38 @@ class UIController(QMainWindow):
         self.current_status = UIStatus.TRANSCRIBING
         self._update_status()
 
-    def _on_transcription_completed(self, data):
+    def _on_transcription_partial(self, data):
+        # Show the tail of the text recognised so far while streaming
+        text = data.get('text', '') if data else ''
+        self._show_progress(text)
+
+    def _on_transcription_segment(self, data):
+        # Segments arrive one at a time; only the tail that fits the status label is kept
+        if not data:
+            return
+        if data.get('audio_path') != self._live_audio_path:
+            self._live_audio_path = data.get('audio_path')
+            self._live_tail = ''
+        self._live_tail = (self._live_tail + data.get('text', '')).lstrip()[-41:]
+        self._show_progress(self._live_tail)
+
+    def _show_progress(self, text):
+        self.current_status = UIStatus.TRANSCRIBING
+        self.status_label.setText(f"...{text[-40:]}" if len(text) > 40 else text or self.current_status.value)
+
+    def _on_transcription_saved(self, data):
         self.set_status_saved()
+        # Search results are not kept live; the list is reloaded when the query changes
+        if not self.search_box.text().strip():
+            self._history_model.upsert(data)
+        if self._history_window is not None:
+            self._history_window.model.upsert(data)
+
+    def _on_transcription_deleted(self, data):
+        if data:
+            self._history_model.remove(data.get('id'))
+            if self._history_window is not None:
+                self._history_window.model.remove(data.get('id'))
 
     def _on_record_clicked(self):
         if self.record_button.isChecked():
@@ -125,7 +195,13 @@ class UIController(QMainWindow):
         self._event_bus.publish(EventType.STOP_RECORDING_REQUESTED)
 
     def _on_history_item_selected(self, index):
-        pass  # To be implemented in next subtask
+        open_transcription(self._storage_manager, self._history_model.transcription_id(index), self)
+
+    def _on_browse_history_clicked(self):
+        if self._history_window is None:
+            self._history_window = HistoryWindow(self._storage_manager, self)
+        self._history_window.show()
+        self._history_window.raise_()
 
     def _update_status(self):
         self.status_label.setText(self.current_status.value)
@@ -136,29 +212,56 @@ class UIController(QMainWindow):
         QTimer.singleShot(3000, self.reset_status)
 
     def reset_status(self):
-        self.current_status = UIStatus.IDLE
+        self.current_status = UIStatus.IDLE if self._model_ready else UIStatus.LOADING
         self._update_status()
 
     def _refresh_history(self):
+        # Only runs at startup and when the search query changes
+        query = self.search_box.text().strip()
         try:
-            transcriptions = self._storage_manager.get_recent_transcriptions(limit=10)
+            if query:
+                transcriptions = self._storage_manager.search(query, limit=self.HISTORY_SIZE)
+            else:
+                transcriptions = self._storage_manager.get_recent_transcriptions(limit=self.HISTORY_SIZE)
         except Exception as e:
             Logger().error(f"Failed to refresh history: {e}")
             transcriptions = []
-        self.history_dropdown.clear()
-        self._history_data = transcriptions
-        if not transcriptions:
-            self.history_dropdown.addItem("No transcription history")
-            return
-        for transcription in transcriptions:
-            timestamp = transcription.get('timestamp', '')
-            text = transcription.get('text', '')
-            preview_words = text.split()[:15]
-            preview = ' '.join(preview_words)
-            if len(text.split()) > 15:
-                preview += '...'
-            entry = f"{timestamp} - {preview}"
-            self.history_dropdown.addItem(entry)
+        self.history_dropdown.setPlaceholderText("No matches" if query else "No transcription history")
+        self._history_model.set_transcriptions(transcriptions)
+
+def open_transcription(storage_manager, transcription_id, parent=None):
+    """Load one transcription with its segments and show it in a TranscriptionHistoryDialog."""
+    if transcription_id is None:
+        return
+    transcription = storage_manager.get_transcription(transcription_id, include_segments=True)
+    if transcription is None:
+        Logger().error(f"Transcription {transcription_id} not found")
+        return
+    TranscriptionHistoryDialog(transcription, parent).exec_()
+
+class HistoryWindow(QDialog):
+    """
+    Browses the whole transcription archive. The list view only lays out and paints the
+    visible rows and asks the model for the next page when scrolled near the end.
+    """
+    PAGE_SIZE = 100
+
+    def __init__(self, storage_manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Transcription History")
+        self.resize(500, 600)
+        self._storage_manager = storage_manager
+        self.model = PagedHistoryModel(storage_manager, page_size=self.PAGE_SIZE, parent=self)
+        layout = QVBoxLayout(self)
+        self._list_view = QListView()
+        self._list_view.setUniformItemSizes(True)
+        self._list_view.setModel(self.model)
+        self._list_view.activated.connect(self._on_row_activated)
+        layout.addWidget(self._list_view)
+        self.model.reload()
+
+    def _on_row_activated(self, index):
+        open_transcription(self._storage_manager, self.model.transcription_id(index.row()), self)
 
 class TranscriptionHistoryDialog(QDialog):
     def __init__(self, transcription, parent=None):
@@ -172,11 +275,27 @@ class TranscriptionHistoryDialog(QDialog):
         self._text_edit.setReadOnly(True)
         self._text_edit.setText(transcription["text"])
         layout.addWidget(self._text_edit)
+        # Segment timestamps, when the transcription was loaded with them
+        segments = transcription.get("segments_metadata")
+        if segments:
+            self._segments_edit = QTextEdit()
+            self._segments_edit.setReadOnly(True)
+            self._segments_edit.setPlainText("\n".join(self._format_segment(segment) for segment in segments))
+            layout.addWidget(self._segments_edit)
         # Copy button
         copy_button = QPushButton("Copy to Clipboard")
         copy_button.clicked.connect(lambda: self._copy_to_clipboard(transcription["text"]))
         layout.addWidget(copy_button)
 
+    @staticmethod
+    def _format_segment(segment):
+        start = segment.get("start")
+        end = segment.get("end")
+        text = str(segment.get("text", "")).strip()
+        if isinstance(start, (int, float)) and isinstance(end, (int, float)):
+            return f"[{start:7.2f} - {end:7.2f}] {text}"
+        return text
+
     def _copy_to_clipboard(self, text):
         clipboard = QApplication.clipboard()
-        clipboard.setText(text) 
\ No newline at end of file
+        clipboard.setText(text)
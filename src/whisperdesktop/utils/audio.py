@@ -0,0 +1,180 @@
+# src/utils/audio.py
+"""
+Audio helpers shared by the recorder and the transcriber worker.
+"""
+
+import os
+import struct
+import wave
+import numpy as np
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(data, channels: int = 1) -> np.ndarray:
+    """
+    Convert interleaved int16 PCM (bytes or ndarray) to mono float32 in [-1, 1].
+    """
+    samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray, memoryview)) else np.asarray(data, dtype=np.int16)
+    audio = samples.astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    return audio
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample a float32 signal with linear interpolation.
+    """
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio
+    duration = len(audio) / src_rate
+    dst_len = int(round(duration * dst_rate))
+    src_times = np.arange(len(audio)) / src_rate
+    dst_times = np.arange(dst_len) / dst_rate
+    return np.interp(dst_times, src_times, audio).astype(np.float32)
+
+
+def wav_duration(path: str) -> float:
+    """
+    Length of an audio file in seconds, read from its WAV header, or from the container
+    for compressed recordings (FLAC/Opus). Falls back to an estimate from the file size
+    (16 kHz mono int16) when the header is unreadable, e.g. while the file is still
+    being written.
+    """
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except Exception:
+        pass
+    if not path.lower().endswith('.wav'):
+        try:
+            import av
+            with av.open(path) as container:
+                if container.duration:
+                    return container.duration / float(av.time_base)
+        except Exception:
+            pass
+    try:
+        return os.path.getsize(path) / (WHISPER_SAMPLE_RATE * 2.0)
+    except Exception:
+        return float('inf')
+
+
+def repair_wav(path: str, dry_run: bool = False) -> bool:
+    """
+    Fix the RIFF and data chunk sizes of a WAV that was not closed, e.g. after a crash.
+    Only the chunk headers are read: the data size is taken from the file size, rounded
+    down to whole frames, and a trailing partial frame is truncated.
+    Args:
+        path (str): WAV file to repair in place
+        dry_run (bool): Only report whether the file needs repairing
+    Returns:
+        bool: True if the header was wrong (and, unless dry_run, has been rewritten)
+    Raises:
+        wave.Error: If the file is not a PCM WAV or has no data chunk
+    """
+    with open(path, 'r+b') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:] != b'WAVE':
+            raise wave.Error(f"{path} is not a WAV file")
+        file_size = os.fstat(f.fileno()).st_size
+        block_align = None
+        while True:
+            chunk_pos = f.tell()
+            header = f.read(8)
+            if len(header) < 8:
+                raise wave.Error(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sL', header)
+            if chunk_id == b'data':
+                break
+            if chunk_id == b'fmt ':
+                fmt = f.read(16)
+                if len(fmt) == 16:
+                    block_align = struct.unpack('<HHLLH', fmt[:14])[4]
+            f.seek(chunk_pos + 8 + chunk_size + (chunk_size & 1))
+        if not block_align:
+            raise wave.Error(f"{path} has no format chunk before its data")
+        data_pos = chunk_pos + 8
+        # A closed file accounts for every byte (other chunks may follow the data)
+        if struct.unpack('<L', riff[4:8])[0] == file_size - 8 and data_pos + chunk_size <= file_size:
+            return False
+        data_size = file_size - data_pos
+        data_size -= data_size % block_align
+        # RIFF chunks are padded to an even size
+        riff_size = data_pos + data_size + (data_size & 1) - 8
+        if dry_run:
+            return True
+        f.truncate(data_pos + data_size)
+        if data_size & 1:
+            f.seek(0, os.SEEK_END)
+            f.write(b'\x00')
+        f.seek(4)
+        f.write(struct.pack('<L', riff_size))
+        f.seek(chunk_pos + 4)
+        f.write(struct.pack('<L', data_size))
+    return True
+
+
+def frame_rms(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    """
+    Root-mean-square energy of consecutive, non-overlapping frames.
+    """
+    n_frames = len(audio) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+class StreamingResampler:
+    """
+    Polyphase FIR resampler for int16 PCM that is fed one chunk at a time.
+
+    The rate ratio is reduced to up/down factors L/M and a windowed-sinc low-pass
+    filter is split into L phases, so each output sample costs `taps_per_phase`
+    multiply-adds and no upsampled signal is ever materialised. Filter history is
+    carried between chunks, so chunked output matches resampling the whole signal.
+    """
+    def __init__(self, src_rate: int, dst_rate: int = WHISPER_SAMPLE_RATE, channels: int = 1, taps_per_phase: int = 32):
+        from math import gcd
+        divisor = gcd(int(src_rate), int(dst_rate))
+        self.src_rate = int(src_rate)
+        self.dst_rate = int(dst_rate)
+        self.channels = channels
+        self._up = self.dst_rate // divisor
+        self._down = self.src_rate // divisor
+        self._taps = taps_per_phase
+        n = self._up * taps_per_phase
+        cutoff = 0.5 / max(self._up, self._down)
+        t = np.arange(n) - (n - 1) / 2.0
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0) * self._up
+        # bank[p, k] = prototype[p + k*L], reversed along k to line up with sliding windows
+        self._bank = prototype.reshape(taps_per_phase, self._up).T[:, ::-1].astype(np.float32)
+        self._history = np.zeros((taps_per_phase - 1, channels), dtype=np.float32)
+        self._in_count = 0
+        self._out_count = 0
+
+    def process(self, data) -> bytes:
+        """Resample a chunk of interleaved int16 PCM and return the int16 output bytes."""
+        samples = np.frombuffer(data, dtype=np.int16)
+        x = samples[:len(samples) - len(samples) % self.channels].reshape(-1, self.channels).astype(np.float32)
+        if len(x) == 0:
+            return b""
+        x_all = np.concatenate([self._history, x])
+        in_before = self._in_count
+        self._in_count += len(x)
+        out_end = (self._in_count * self._up + self._down - 1) // self._down
+        m = np.arange(self._out_count, out_end, dtype=np.int64)
+        self._out_count = out_end
+        self._history = x_all[len(x_all) - (self._taps - 1):]
+        if len(m) == 0:
+            return b""
+        pos = m * self._down
+        start = pos // self._up - in_before
+        coeffs = self._bank[pos % self._up]
+        out = np.empty((len(m), self.channels), dtype=np.float32)
+        for channel in range(self.channels):
+            windows = np.lib.stride_tricks.sliding_window_view(x_all[:, channel], self._taps)
+            out[:, channel] = np.einsum('ij,ij->i', coeffs, windows[start])
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16).tobytes()
@@ -0,0 +1,142 @@
+# src/utils/metrics.py
+"""
+Process-wide performance metrics (timings, counters and gauges) using the Singleton pattern,
+and a reporter that writes them to the log.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+from whisperdesktop.utils.logger import Logger
+
+
+class Metrics:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(Metrics, cls).__new__(cls)
+                cls._instance._initialize()
+            return cls._instance
+
+    def _initialize(self):
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+        self._metrics_lock = threading.Lock()
+
+    def record(self, name: str, value: float):
+        """Record one observation of a timing/size metric (count, total, min, max, last)."""
+        with self._metrics_lock:
+            stats = self._timings.get(name)
+            if stats is None:
+                self._timings[name] = {"count": 1, "total": value, "min": value, "max": value, "last": value}
+            else:
+                stats["count"] += 1
+                stats["total"] += value
+                stats["min"] = min(stats["min"], value)
+                stats["max"] = max(stats["max"], value)
+                stats["last"] = value
+
+    def increment(self, name: str, amount: int = 1):
+        with self._metrics_lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        with self._metrics_lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> Any:
+        """Return the current stats dict, counter or gauge value for `name`, or None."""
+        with self._metrics_lock:
+            if name in self._timings:
+                stats = dict(self._timings[name])
+                stats["mean"] = stats["total"] / stats["count"]
+                return stats
+            if name in self._counters:
+                return self._counters[name]
+            return self._gauges.get(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            timings = {}
+            for name, stats in self._timings.items():
+                timings[name] = dict(stats, mean=stats["total"] / stats["count"])
+            return {
+                "timings": timings,
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges)
+            }
+
+    def reset(self):
+        with self._metrics_lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+
+def _format_value(value) -> str:
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+
+def _format_values(values: Dict[str, Any]) -> str:
+    return ", ".join(f"{key}={_format_value(value)}" for key, value in values.items())
+
+
+def format_report(snapshot: Dict[str, Any], event_stats: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """
+    Render a Metrics snapshot, and optionally EventBus.get_stats(), as log text.
+    Returns:
+        str: One line per metric, grouped by kind
+    """
+    lines = ["Metrics report:"]
+    for name, stats in sorted(snapshot["timings"].items()):
+        lines.append(f"  timing {name}: {_format_values(stats)}")
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.append(f"  counter {name}: {value}")
+    for name, value in sorted(snapshot["gauges"].items()):
+        lines.append(f"  gauge {name}: {_format_value(value)}")
+    for name, stats in sorted((event_stats or {}).items()):
+        lines.append(f"  event {name}: {_format_values(stats)}")
+    return "\n".join(lines)
+
+
+class MetricsReporter:
+    """
+    Logs the Metrics snapshot and the EventBus dispatch stats every `interval` seconds
+    (0 = never) from a background thread, and once more when stopped.
+    """
+    def __init__(self, interval: float = 0.0, event_bus=None):
+        self._interval = interval
+        self._event_bus = event_bus
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def report(self) -> str:
+        """Return the current report text."""
+        event_stats = self._event_bus.get_stats() if self._event_bus is not None else None
+        return format_report(Metrics().snapshot(), event_stats)
+
+    def start(self):
+        if self._interval > 0:
+            self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            self._log()
+
+    def _log(self):
+        try:
+            Logger().info(self.report())
+        except Exception as e:
+            Logger().error(f"Error writing metrics report: {e}")
+
+    def stop(self):
+        """Stop the periodic reports and log a final one."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._log()
@@ -52,4 +52,104 @@ def test_integration_with_mock_subscribers():
     assert ('s1', {'result': 'ok'}) in called
     assert ('s2', {'result': 'ok'}) in called
     bus.unsubscribe(EventType.TRANSCRIPTION_COMPLETED, mock_subscriber_1)
-    bus.unsubscribe(EventType.TRANSCRIPTION_COMPLETED, mock_subscriber_2) 
\ No newline at end of file
+    bus.unsubscribe(EventType.TRANSCRIPTION_COMPLETED, mock_subscriber_2) 
+def test_async_subscriber_does_not_block_publisher():
+    import threading
+    import time
+    bus = EventBus()
+    release = threading.Event()
+    delivered = threading.Event()
+    received = []
+    def slow_subscriber(payload):
+        release.wait(timeout=5)
+        received.append(payload)
+        delivered.set()
+    bus.subscribe(EventType.CONFIG_CHANGED, slow_subscriber, asynchronous=True)
+    try:
+        start = time.perf_counter()
+        bus.publish(EventType.CONFIG_CHANGED, {'key': 'value'})
+        assert time.perf_counter() - start < 1.0
+        assert received == []
+        assert bus.get_stats()['CONFIG_CHANGED']['queue_depth'] == 1
+        release.set()
+        assert delivered.wait(timeout=5)
+        assert received == [{'key': 'value'}]
+    finally:
+        bus.unsubscribe(EventType.CONFIG_CHANGED, slow_subscriber)
+    stats = bus.get_stats()['CONFIG_CHANGED']
+    assert stats['delivered_async'] >= 1
+    assert stats['queue_depth'] == 0
+
+def test_subscriber_can_unsubscribe_during_publish():
+    bus = EventBus()
+    calls = []
+    def once(payload):
+        calls.append(payload)
+        bus.unsubscribe(EventType.CONFIG_RESET, once)
+    bus.subscribe(EventType.CONFIG_RESET, once)
+    bus.publish(EventType.CONFIG_RESET, 1)
+    bus.publish(EventType.CONFIG_RESET, 2)
+    assert calls == [1]
+
+def test_bridge_batches_and_coalesces_partials():
+    import threading
+    from src.event_bus.process_bridge import EventBridge
+    received = []
+    done = threading.Event()
+    def deliver(event_type, payload):
+        received.append((event_type, payload))
+        if event_type == EventType.TRANSCRIPTION_COMPLETED:
+            done.set()
+    bridge = EventBridge(deliver=deliver, flush_interval=0.2)
+    bridge.start()
+    sender = bridge.sender
+    sender.start()
+    for i in range(10):
+        sender.send(EventType.TRANSCRIPTION_PARTIAL, {"audio_path": "a.wav", "text": "x" * i})
+    sender.send(EventType.TRANSCRIPTION_COMPLETED, {"audio_path": "a.wav", "text": "done"})
+    sender.close()
+    assert done.wait(2.0)
+    bridge.stop()
+    assert received == [
+        (EventType.TRANSCRIPTION_PARTIAL, {"audio_path": "a.wav", "text": "x" * 9}),
+        (EventType.TRANSCRIPTION_COMPLETED, {"audio_path": "a.wav", "text": "done"}),
+    ]
+
+def test_result_dispatcher_stop_delivers_pending_results():
+    import queue
+    from PyQt5.QtCore import QCoreApplication
+    from src.ui.result_dispatcher import ResultDispatcher
+    app = QCoreApplication.instance() or QCoreApplication([])
+    results = queue.Queue()
+    handled = []
+    dispatcher = ResultDispatcher(results, handled.append)
+    # Results left over when the workers shut down, with no Qt event loop running
+    for i in range(3):
+        results.put({"audio_path": f"{i}.wav", "text": str(i)})
+    dispatcher.start()
+    dispatcher.stop()
+    assert [result["audio_path"] for result in handled] == ["0.wav", "1.wav", "2.wav"]
+
+def test_metrics_reporter_logs_metrics_and_event_stats():
+    from unittest.mock import patch
+    from src.utils.metrics import Metrics, MetricsReporter
+    bus = EventBus()
+    bus.publish(EventType.CONFIG_RESET, None)
+    metrics = Metrics()
+    metrics.reset()
+    metrics.record("model_load_s", 1.5)
+    metrics.increment("recordings")
+    metrics.set_gauge("job_queue_depth", 3)
+    reporter = MetricsReporter(interval=0, event_bus=bus)
+    report = reporter.report()
+    assert "timing model_load_s: count=1, total=1.5" in report
+    assert "counter recordings: 1" in report
+    assert "gauge job_queue_depth: 3" in report
+    assert "event CONFIG_RESET: published=" in report
+    with patch('src.utils.metrics.Logger') as logger:
+        reporter.start()
+        reporter.stop()
+    # No periodic reports with interval 0, but always one at exit
+    logger.return_value.info.assert_called_once()
+    assert "model_load_s" in logger.return_value.info.call_args.args[0]
+    metrics.reset()
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import MagicMock
+from src.ui.history_model import HistoryListModel, make_preview
+
+def _ids(model):
+    return [model.transcription_id(row) for row in range(model.rowCount())]
+
+def test_make_preview():
+    assert make_preview("one two three", words=2) == "one two..."
+    assert make_preview("  one   two ", words=2) == "one two"
+
+def test_upsert_prepends_and_caps_rows():
+    model = HistoryListModel(capacity=3)
+    model.set_transcriptions([{"id": 2, "timestamp": "t2", "text": "b"}, {"id": 1, "timestamp": "t1", "text": "a"}])
+    inserted = MagicMock()
+    model.rowsInserted.connect(inserted)
+    for i in (3, 4):
+        model.upsert({"id": i, "timestamp": f"t{i}", "text": f"text {i}"})
+    assert _ids(model) == [4, 3, 2]
+    assert inserted.call_count == 2
+    assert model.data(model.index(0)) == "t4 - text 4"
+
+def test_upsert_updates_existing_row_and_remove():
+    model = HistoryListModel()
+    model.set_transcriptions([{"id": 1, "timestamp": "t1", "text": "old"}])
+    changed = MagicMock()
+    model.dataChanged.connect(changed)
+    model.upsert({"id": 1, "text": "new"})
+    model.upsert({"id": 1, "text": None})
+    assert model.data(model.index(0)) == "t1 - new"
+    assert changed.call_count == 1
+    model.remove(1)
+    model.remove(99)
+    assert model.rowCount() == 0
+
+def test_paged_model_fetches_keyset_pages(tmp_path):
+    from src.storage.storage_manager import StorageManager
+    from src.ui.history_model import PagedHistoryModel
+    sm = StorageManager(db_path=str(tmp_path / 'test.db'), event_bus=MagicMock())
+    ids = [sm.save_transcription(f"entry {i} " + "word " * 500, [], None) for i in range(25)]
+    model = PagedHistoryModel(sm, page_size=10)
+    model.reload()
+    assert _ids(model) == ids[::-1][:10]
+    while model.canFetchMore():
+        model.fetchMore()
+    assert _ids(model) == ids[::-1]
+    # Rows only keep the preview, not the full text
+    assert model.data(model.index(0)).endswith("...")
+    assert len(model.data(model.index(0))) < 200
+    sm.close()
@@ -5,6 +5,11 @@ import pytest
 from unittest.mock import patch, MagicMock
 from src.recorder.recorder import Recorder, RecordingMode
 
+@pytest.fixture(autouse=True)
+def _in_tmp_dir(tmp_path, monkeypatch):
+    # The recorder creates its WAV file under ./recordings
+    monkeypatch.chdir(tmp_path)
+
 @patch('src.recorder.recorder.pyaudio.PyAudio')
 @patch('src.recorder.recorder.wave.open')
 @patch('src.recorder.recorder.EventBus')
@@ -60,4 +65,348 @@ def test_eventbus_integration(mock_wave_open, mock_pyaudio):
     recorder.start_recording(RecordingMode.TOGGLE)
     recorder.stop_recording()
     assert events[0][0] == 'started'
-    assert events[1][0] == 'stopped' 
\ No newline at end of file
+    assert events[1][0] == 'stopped' 
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.wave.open')
+@patch('src.recorder.recorder.EventBus')
+def test_streaming_recording_sends_chunks(mock_eventbus, mock_wave_open, mock_pyaudio):
+    from src.transcriber.streaming import STREAM_START, STREAM_CHUNK, STREAM_END
+    mock_audio = MagicMock()
+    mock_pyaudio.return_value = mock_audio
+    mock_wave_open.return_value = MagicMock()
+    queue = MagicMock()
+    mock_eventbus.return_value.get_queue.return_value = queue
+    recorder = Recorder(streaming=True)
+    recorder.start_recording(RecordingMode.TOGGLE)
+    recorder._audio_callback(b'\x00\x01' * 4, 4, None, 0)
+    recorder.stop_recording()
+    types = [call.args[0]["type"] for call in queue.put.call_args_list]
+    assert types == [STREAM_START, STREAM_CHUNK, STREAM_END]
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.wave.open')
+@patch('src.recorder.recorder.EventBus')
+def test_shared_memory_recording_queues_pcm_reference(mock_eventbus, mock_wave_open, mock_pyaudio):
+    from src.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+    mock_pyaudio.return_value = MagicMock()
+    mock_wave = MagicMock()
+    mock_wave_open.return_value = mock_wave
+    queue = MagicMock()
+    mock_eventbus.return_value.get_queue.return_value = queue
+    recorder = Recorder(sample_rate=16000, shared_memory=True, shared_buffer_seconds=1)
+    try:
+        recorder.start_recording(RecordingMode.TOGGLE)
+        chunk = bytes(range(256)) * 8
+        recorder._audio_callback(chunk, len(chunk) // 2, None, 0)
+        recorder.stop_recording()
+        job = queue.put.call_args.args[0]
+        assert job["audio_path"] == recorder._file_path
+        reader = SharedPCMRingBuffer.attach(job["pcm"]["name"])
+        assert reader.read(job["pcm"]["start"], job["pcm"]["end"]).tobytes() == chunk
+        reader.close()
+        # The WAV is still written, by the writer thread
+        mock_wave.writeframes.assert_called_once_with(chunk)
+        mock_wave.close.assert_called()
+    finally:
+        recorder.cleanup()
+
+def test_shared_pcm_ring_buffer_wraps_and_detects_overwrite():
+    import numpy as np
+    from src.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+    buffer = SharedPCMRingBuffer.create(capacity_frames=10, channels=1, sample_rate=16000)
+    try:
+        buffer.write(np.arange(8, dtype=np.int16).tobytes())
+        buffer.write(np.arange(8, 14, dtype=np.int16).tobytes())
+        assert buffer.frames_written == 14
+        assert buffer.read(6, 14).tolist() == list(range(6, 14))
+        assert buffer.read(0, 8) is None
+    finally:
+        buffer.close()
+
+def test_shared_pcm_attach_keeps_creator_tracker_registration():
+    import numpy as np
+    from src.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+    buffer = SharedPCMRingBuffer.create(capacity_frames=10, channels=1, sample_rate=16000)
+    try:
+        buffer.write(np.arange(4, dtype=np.int16).tobytes())
+        # The resource tracker is already running and shared with the reader: unregistering
+        # there would leave the creator's unlink() with nothing to unregister
+        with patch('src.recorder.shared_pcm_buffer.resource_tracker.unregister') as unregister:
+            reader = SharedPCMRingBuffer.attach(buffer.name)
+            assert reader.read(0, 4).tolist() == [0, 1, 2, 3]
+            reader.close()
+        unregister.assert_not_called()
+    finally:
+        buffer.close()
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.wave.open')
+@patch('src.recorder.recorder.EventBus')
+def test_resamples_when_device_cannot_capture_16k(mock_eventbus, mock_wave_open, mock_pyaudio):
+    import numpy as np
+    mock_audio = MagicMock()
+    mock_audio.get_default_input_device_info.return_value = {'index': 0, 'defaultSampleRate': 48000.0}
+    mock_audio.is_format_supported.side_effect = ValueError('Invalid sample rate')
+    mock_pyaudio.return_value = mock_audio
+    mock_wave = MagicMock()
+    mock_wave_open.return_value = mock_wave
+    recorder = Recorder()
+    recorder.start_recording(RecordingMode.TOGGLE)
+    assert mock_audio.open.call_args.kwargs['rate'] == 48000
+    mock_wave.setframerate.assert_called_with(16000)
+    recorder._audio_callback(np.zeros(1536, dtype=np.int16).tobytes(), 1536, None, 0)
+    recorder.stop_recording()
+    # Resampled by the writer thread, not in the callback
+    assert len(mock_wave.writeframes.call_args.args[0]) == 512 * 2
+
+def test_streaming_resampler_matches_one_shot_resampling():
+    import numpy as np
+    from src.utils.audio import StreamingResampler
+    t = np.arange(44100) / 44100
+    signal = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    whole = StreamingResampler(44100, 16000).process(signal.tobytes())
+    chunked_resampler = StreamingResampler(44100, 16000)
+    chunked = b''.join(chunked_resampler.process(signal[i:i + 1024].tobytes()) for i in range(0, len(signal), 1024))
+    assert whole == chunked
+    assert len(whole) == 16000 * 2
+
+def _write_wav(path, frames=1600):
+    import wave
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b'\x01\x00' * frames)
+
+def test_recovery_scan_requeues_unsaved_recordings(tmp_path):
+    import time
+    from src.storage.storage_manager import StorageManager
+    from src.recorder.recovery import RecoveryScanner, RECOVERY_PRIORITY
+    recordings = tmp_path / 'recordings'
+    recordings.mkdir()
+    for i, name in enumerate(['old.wav', 'saved.wav', 'new.wav']):
+        _write_wav(recordings / name)
+        os.utime(recordings / name, (time.time() - 100 + i, time.time() - 100 + i))
+    (recordings / 'empty.wav').write_bytes(b'')
+    (recordings / 'notes.txt').write_text('x')
+    sm = StorageManager(db_path=str(tmp_path / 'test.db'), event_bus=MagicMock())
+    sm.save_transcription("already done", [], str(recordings / 'saved.wav'))
+    queue = MagicMock()
+    scanner = RecoveryScanner(sm, queue, recordings_dir=str(recordings), delay=0)
+    # Written after startup: belongs to the live pipeline, not to recovery
+    _write_wav(recordings / 'live.wav')
+    os.utime(recordings / 'live.wav', (time.time() + 5, time.time() + 5))
+    scanner.start()
+    scanner.join(2.0)
+    jobs = [c.args[0] for c in queue.put.call_args_list]
+    assert [os.path.basename(j["audio_path"]) for j in jobs] == ['old.wav', 'new.wav']
+    assert all(j["priority"] == RECOVERY_PRIORITY for j in jobs)
+    sm.close()
+
+def test_recovery_scan_skips_silent_and_failed_recordings(tmp_path):
+    import time
+    from src.storage.storage_manager import StorageManager
+    from src.storage.job_queue import JobQueue, QUEUED
+    from src.recorder.recovery import RecoveryScanner
+    recordings = tmp_path / 'recordings'
+    recordings.mkdir()
+    paths = {}
+    for i, name in enumerate(['silent.wav', 'broken.wav', 'pending.wav']):
+        _write_wav(recordings / name)
+        os.utime(recordings / name, (time.time() - 100 + i, time.time() - 100 + i))
+        paths[name] = str(recordings / name)
+    db_path = str(tmp_path / 'test.db')
+    sm = StorageManager(db_path=db_path, event_bus=MagicMock())
+    jobs = JobQueue(db_path, max_attempts=1)
+    # A silent recording transcribes to nothing: no transcription row, but its job is done
+    silent_id = jobs.enqueue({"audio_path": paths['silent.wav']})
+    jobs.claim(0)
+    sm.enqueue_save({"text": "", "segments": [], "audio_path": paths['silent.wav']},
+                    on_saved=lambda tid, result: jobs.complete(silent_id) if tid < 0 else None)
+    sm.flush()
+    broken_id = jobs.enqueue({"audio_path": paths['broken.wav']})
+    jobs.claim(0)
+    jobs.fail(broken_id, "decode failed")
+    jobs.enqueue({"audio_path": paths['pending.wav']})
+    assert jobs.stats()[QUEUED] == 1
+    queue = MagicMock()
+    scanner = RecoveryScanner(sm, queue, recordings_dir=str(recordings), delay=0, job_queue=jobs)
+    scanner.start()
+    scanner.join(2.0)
+    assert [c.args[0]["audio_path"] for c in queue.put.call_args_list] == [paths['pending.wav']]
+    jobs.close()
+    sm.close()
+
+def test_capture_ring_buffer_wraps_and_counts_drops():
+    from src.recorder.capture_buffer import CaptureRingBuffer
+    ring = CaptureRingBuffer(capacity=9, align=2)
+    assert ring.capacity == 8
+    assert ring.write(b'abcdef') == 6
+    assert ring.read(4) == b'abcd'
+    # Wraps around the end; only whole frames fit, the rest is dropped
+    assert ring.write(b'ghijklmn') == 6
+    assert ring.dropped_bytes == 2
+    assert ring.high_water == 8
+    assert ring.read() == b'efghijkl'
+    assert ring.available() == 0
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.wave.open')
+@patch('src.recorder.recorder.EventBus')
+def test_slow_disk_does_not_drop_audio(mock_eventbus, mock_wave_open, mock_pyaudio):
+    import time
+    mock_pyaudio.return_value = MagicMock()
+    mock_wave = MagicMock()
+    written = []
+    def slow_writeframes(data):
+        time.sleep(0.2)
+        written.append(data)
+    mock_wave.writeframes.side_effect = slow_writeframes
+    mock_wave_open.return_value = mock_wave
+    recorder = Recorder(sample_rate=16000, wav_block_seconds=0.01)
+    recorder.start_recording(RecordingMode.TOGGLE)
+    chunks = [bytes([i]) * 2048 for i in range(20)]
+    start = time.perf_counter()
+    for chunk in chunks:
+        recorder._audio_callback(chunk, len(chunk) // 2, None, 0)
+    # The callback never waits for the disk
+    assert time.perf_counter() - start < 0.1
+    recorder.stop_recording()
+    assert b''.join(written) == b''.join(chunks)
+    assert recorder.dropped_frames == 0
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.EventBus')
+def test_wav_header_is_valid_while_recording(mock_eventbus, mock_pyaudio):
+    import time
+    import wave
+    mock_pyaudio.return_value.get_sample_size.return_value = 2
+    recorder = Recorder(sample_rate=16000, wav_block_seconds=0.01, checkpoint_seconds=0)
+    recorder.start_recording(RecordingMode.TOGGLE)
+    recorder._audio_callback(b'\x01\x00' * 1600, 1600, None, 0)
+    deadline = time.time() + 2
+    frames = 0
+    while frames < 1600 and time.time() < deadline:
+        time.sleep(0.02)
+        # What a crash at this point would leave on disk
+        with wave.open(recorder._file_path, 'rb') as wav:
+            frames = wav.getnframes()
+    assert frames == 1600
+    recorder.stop_recording()
+
+def _write_truncated_wav(path, data_bytes):
+    import struct
+    # Header as written by wave.open(..., 'wb') before any size was patched
+    header = struct.pack('<4sL4s4sLHHLLHH4sL', b'RIFF', 36, b'WAVE', b'fmt ', 16, 1, 1, 16000, 32000, 2, 16, b'data', 0)
+    path.write_bytes(header + b'\x01\x00' * (data_bytes // 2) + b'\x01' * (data_bytes % 2))
+
+def test_repair_wav_fixes_sizes_and_drops_partial_frame(tmp_path):
+    import wave
+    from src.utils.audio import repair_wav
+    path = tmp_path / 'crashed.wav'
+    _write_truncated_wav(path, 3201)
+    assert repair_wav(str(path), dry_run=True)
+    assert path.stat().st_size == 44 + 3201
+    assert repair_wav(str(path))
+    assert path.stat().st_size == 44 + 3200
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnframes() == 1600
+    # Already consistent: left alone
+    assert not repair_wav(str(path))
+    _write_wav(tmp_path / 'ok.wav')
+    assert not repair_wav(str(tmp_path / 'ok.wav'))
+    (tmp_path / 'bad.wav').write_bytes(b'not a wav file at all')
+    with pytest.raises(wave.Error):
+        repair_wav(str(tmp_path / 'bad.wav'))
+
+def _tone(seconds, amplitude=8000, rate=16000):
+    import numpy as np
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * 220 * t) * amplitude).astype(np.int16).tobytes()
+
+def _silence(seconds, rate=16000):
+    return b'\x00\x00' * int(seconds * rate)
+
+def test_speech_segmenter_opens_and_closes_on_voice_activity():
+    from src.recorder.voice_activity import (SpeechSegmenter, VoiceActivityDetector,
+                                             SEGMENT_OPEN, SEGMENT_AUDIO, SEGMENT_CLOSE)
+    segmenter = SpeechSegmenter(detector=VoiceActivityDetector(use_model=False), padding_ms=96)
+    events = []
+    # Fed in odd-sized pieces, as the writer thread drains them
+    audio = _silence(1.0) + _tone(1.0) + _silence(1.5) + _tone(0.1) + _silence(0.5)
+    for i in range(0, len(audio), 3001):
+        events += segmenter.feed(audio[i:i + 3001])
+    events += segmenter.flush()
+    kinds = [kind for kind, _ in events if kind != SEGMENT_AUDIO]
+    assert kinds == [SEGMENT_OPEN, SEGMENT_CLOSE, SEGMENT_OPEN, SEGMENT_CLOSE]
+    first_close = next(i for i, (kind, _) in enumerate(events) if kind == SEGMENT_CLOSE)
+    first = b''.join(data for kind, data in events[:first_close])
+    # Padding + speech + hangover, not the silence around it
+    assert 1.0 <= len(first) / 32000 <= 2.0
+    assert events[first_close][1] is True
+    # 100 ms of sound is too short to keep
+    assert events[-1] == (SEGMENT_CLOSE, False)
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.EventBus')
+def test_voice_activated_recording_queues_speech_segments(mock_eventbus, mock_pyaudio):
+    import wave
+    from src.recorder.voice_activity import VoiceActivityDetector
+    mock_pyaudio.return_value.get_sample_size.return_value = 2
+    queue = MagicMock()
+    mock_eventbus.return_value.get_queue.return_value = queue
+    recorder = Recorder(sample_rate=16000)
+    recorder._vad_detector = VoiceActivityDetector(use_model=False)
+    recorder.start_recording(RecordingMode.VOICE_ACTIVATED)
+    for chunk in (_silence(2.0), _tone(1.0), _silence(1.5), _tone(0.5)):
+        recorder._audio_callback(chunk, len(chunk) // 2, None, 0)
+    recorder.stop_recording()
+    paths = [c.args[0] for c in queue.put.call_args_list]
+    assert len(paths) == 2
+    assert sorted(os.listdir('recordings')) == sorted(os.path.basename(p) for p in paths)
+    with wave.open(paths[0], 'rb') as wav:
+        # The leading silence was never written
+        assert wav.getnframes() < 2.5 * 16000
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.wave.open')
+@patch('src.recorder.recorder.EventBus')
+def test_preroll_splices_audio_from_before_start(mock_eventbus, mock_wave_open, mock_pyaudio):
+    mock_audio = MagicMock()
+    mock_pyaudio.return_value = mock_audio
+    mock_wave = MagicMock()
+    mock_wave_open.return_value = mock_wave
+    recorder = Recorder(sample_rate=16000, preroll_ms=100)
+    try:
+        # The stream is opened up front and stays open between recordings
+        assert mock_audio.open.call_count == 1
+        recorder._audio_callback(b'\x01\x00' * 3200, 3200, None, 0)
+        recorder._audio_callback(b'\x02\x00' * 1600, 1600, None, 0)
+        recorder.start_recording(RecordingMode.TOGGLE)
+        recorder._audio_callback(b'\x03\x00' * 800, 800, None, 0)
+        recorder.stop_recording()
+        # Arrives after stop: next recording's pre-roll, not this recording
+        recorder._audio_callback(b'\x04\x00' * 800, 800, None, 0)
+        written = b''.join(c.args[0] for c in mock_wave.writeframes.call_args_list)
+        assert written == b'\x02\x00' * 1600 + b'\x03\x00' * 800
+        assert mock_audio.open.call_count == 1
+        mock_audio.open.return_value.stop_stream.assert_not_called()
+    finally:
+        recorder.cleanup()
+    mock_audio.open.return_value.stop_stream.assert_called_once()
+
+@patch('src.recorder.recorder.pyaudio.PyAudio')
+@patch('src.recorder.recorder.EventBus')
+def test_kept_recordings_are_encoded_as_flac(mock_eventbus, mock_pyaudio):
+    from faster_whisper.audio import decode_audio
+    from src.utils.audio import wav_duration
+    mock_pyaudio.return_value.get_sample_size.return_value = 2
+    recorder = Recorder(sample_rate=16000, audio_format='flac', wav_block_seconds=0.25)
+    recorder.start_recording(RecordingMode.TOGGLE)
+    audio = _silence(0.5) + _tone(1.5)
+    recorder._audio_callback(audio, len(audio) // 2, None, 0)
+    path = recorder.stop_recording()
+    assert path.endswith('.flac')
+    assert os.path.getsize(path) < len(audio) // 2
+    assert len(decode_audio(path)) == 2 * 16000
+    assert abs(wav_duration(path) - 2.0) < 0.01
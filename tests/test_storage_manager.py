@@ -104,4 +104,186 @@ def test_delete_audio_file(tmp_path, temp_db_path):
     assert sm.delete_audio_file(str(audio_file))
     assert not audio_file.exists()
     # File does not exist
-    assert not sm.delete_audio_file(str(audio_file)) 
\ No newline at end of file
+    assert not sm.delete_audio_file(str(audio_file)) 
+def test_connection_is_shared_and_uses_wal(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    with sm._get_connection() as first, sm._get_connection() as second:
+        assert first is second
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    sm.close()
+    with pytest.raises(Exception):
+        with sm._get_connection():
+            pass
+
+def test_concurrent_saves_from_threads(temp_db_path):
+    import threading
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    def save_many(n):
+        for i in range(20):
+            sm.save_transcription(f"thread {n} item {i}", [], None)
+    threads = [threading.Thread(target=save_many, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(sm.get_recent_transcriptions(limit=100)) == 80
+    sm.close()
+
+def test_schema_migrations_add_indexes(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    with sm._get_connection() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert version >= 1
+    assert {"idx_transcriptions_timestamp", "idx_transcriptions_audio_path"} <= indexes
+    sm.close()
+    # Reopening an up-to-date database is a no-op
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    with sm._get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+    sm.close()
+
+def test_keyset_pagination(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    ids = [sm.save_transcription(f"t{i}", [], None) for i in range(7)]
+    pages = []
+    cursor = None
+    while True:
+        page = sm.get_transcriptions_before(cursor, limit=3)
+        if not page:
+            break
+        pages.append([row["id"] for row in page])
+        cursor = page[-1]["id"]
+    assert pages == [ids[6:3:-1], ids[3:0:-1], ids[0:1]]
+    assert [row["id"] for row in sm.get_recent_transcriptions(limit=2)] == [ids[6], ids[5]]
+    sm.close()
+
+def test_full_text_search(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    meeting = sm.save_transcription("Notes from the quarterly budget meeting", [], None)
+    sm.save_transcription("Grocery list: apples, bread", [], None)
+    reminder = sm.save_transcription("Budget reminder: send the budget to finance", [], None)
+    results = sm.search("budget")
+    assert [r["id"] for r in results] == [reminder, meeting]
+    assert "[budget]" in results[1]["snippet"].lower()
+    # Prefix match on the last word, operators and quotes treated as text
+    assert [r["id"] for r in sm.search("quarterly bud")] == [meeting]
+    assert sm.search('budget" OR "apples') == []
+    assert sm.search("   ") == []
+    # Index follows updates and deletes
+    sm.update_transcription(meeting, text="Notes from the planning meeting")
+    sm.delete_transcription(reminder)
+    assert sm.search("budget") == []
+    assert [r["id"] for r in sm.search("planning")] == [meeting]
+    sm.close()
+
+def test_search_index_backfills_existing_rows(temp_db_path):
+    import sqlite3
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("CREATE TABLE transcriptions (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, text TEXT NOT NULL, segments_metadata TEXT NOT NULL, audio_path TEXT)")
+    conn.execute("INSERT INTO transcriptions (timestamp, text, segments_metadata) VALUES ('2020-01-01T00:00:00', 'an old recording', '[]')")
+    conn.commit()
+    conn.close()
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    assert [r["text"] for r in sm.search("recording")] == ["an old recording"]
+    sm.close()
+
+def test_segments_are_packed_and_decoded_lazily(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    # Shaped like the transcriber's output: faster-whisper numbers segments from 1
+    segments = [
+        {"id": 1, "start": 0.0, "end": 2.34, "text": " Hello"},
+        {"id": 2, "start": 2.34, "end": 5.1, "text": " wörld ✓"},
+    ]
+    tid = sm.save_transcription("Hello wörld ✓", segments, None)
+    with sm._get_connection() as conn:
+        stored_json, blob = conn.execute("SELECT segments_metadata, segments_blob FROM transcriptions WHERE id = ?", (tid,)).fetchone()
+    assert stored_json == "" and blob is not None
+    assert sm.get_segments(tid) == segments
+    assert sm.get_transcription(tid)["segments_metadata"] == segments
+    assert "segments_metadata" not in sm.get_transcription(tid, include_segments=False)
+    assert "segments_metadata" not in sm.get_recent_transcriptions(limit=1)[0]
+    assert sm.get_recent_transcriptions(limit=1, include_segments=True)[0]["segments_metadata"] == segments
+    sm.close()
+
+def test_non_canonical_segments_fall_back_to_json(temp_db_path):
+    from src.storage.segment_codec import pack_segments
+    assert pack_segments([{"start": 0, "end": 1, "text": "a", "words": []}]) is None
+    assert pack_segments([{"id": 1, "start": 0, "end": 1, "text": "a"}, {"id": 3, "start": 1, "end": 2, "text": "b"}]) is None
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock())
+    segments = [{"start": 0, "end": 1, "text": "a", "avg_logprob": -0.2}]
+    tid = sm.save_transcription("a", segments, None)
+    assert sm.get_segments(tid) == segments
+    sm.close()
+
+def test_segment_blobs_round_trip_ids_and_old_format():
+    import struct
+    from src.storage.segment_codec import pack_segments, unpack_segments
+    segments = [{"id": 7, "start": 0.0, "end": 1.5, "text": " a"}, {"id": 8, "start": 1.5, "end": 2.0, "text": " b"}]
+    assert unpack_segments(pack_segments(segments)) == segments
+    # Version 1 blobs had no id base and numbered from 0
+    v1 = struct.pack("<2sBBI", b"SG", 1, 1, 1) + struct.pack("<ffI", 0.0, 1.0, 2) + b" a"
+    assert unpack_segments(v1) == [{"id": 0, "start": 0.0, "end": 1.0, "text": " a"}]
+
+def test_save_transcriptions_bulk(temp_db_path):
+    mock_eventbus = MagicMock()
+    sm = StorageManager(db_path=temp_db_path, event_bus=mock_eventbus)
+    results = [
+        {"text": "first", "segments": [{"start": 0.0, "end": 1.0, "text": "first"}], "audio_path": "a.wav"},
+        {"text": "", "segments": [], "audio_path": "empty.wav"},
+        {"text": "second", "segments": [], "audio_path": None},
+    ]
+    ids = sm.save_transcriptions_bulk(results, durable=True)
+    assert ids[1] == -1 and ids[0] > 0 and ids[2] > ids[0]
+    assert sm.get_transcription(ids[0])["audio_path"] == "a.wav"
+    assert mock_eventbus.publish.call_count == 2
+    with sm._get_connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # back to NORMAL
+    sm.close()
+
+def test_write_behind_groups_saves_and_reports_after_commit(temp_db_path):
+    sm = StorageManager(db_path=temp_db_path, event_bus=MagicMock(), write_behind_window=0.2)
+    saved = []
+    def on_saved(transcription_id, result):
+        # The row must already be readable when the callback runs
+        row = sm.get_transcription(transcription_id) if transcription_id > 0 else None
+        saved.append((transcription_id, result["audio_path"], row is not None))
+    with patch.object(sm, "save_transcriptions_bulk", wraps=sm.save_transcriptions_bulk) as bulk:
+        for i in range(5):
+            sm.enqueue_save({"text": f"t{i}", "segments": [], "audio_path": f"{i}.wav"}, on_saved=on_saved)
+        sm.enqueue_save({"text": "", "segments": [], "audio_path": "bad.wav"}, on_saved=on_saved)
+        sm.flush()
+        assert bulk.call_count == 1
+    assert [path for _, path, _ in saved] == ["0.wav", "1.wav", "2.wav", "3.wav", "4.wav", "bad.wav"]
+    assert all(ok for tid, _, ok in saved if tid > 0)
+    assert saved[-1][0] == -1
+    sm.close()
+
+def test_job_queue_claims_in_order_with_backoff_and_recovery(temp_db_path):
+    import time
+    from src.storage.job_queue import JobQueue, QUEUED, RUNNING, FAILED
+    jobs = JobQueue(temp_db_path, max_attempts=2, retry_base_delay=60)
+    long_id = jobs.enqueue({"audio_path": "long.wav"}, priority=0, duration=30.0)
+    short_id = jobs.enqueue("short.wav", priority=0, duration=2.0)
+    recovered_id = jobs.enqueue({"audio_path": "old.wav"}, priority=10, duration=1.0)
+    assert jobs.enqueue("short.wav") is None
+    assert jobs.claim(0) == (short_id, "short.wav")
+    assert jobs.claim(1)[0] == long_id
+    # First failure backs off; the second uses up the attempts
+    assert jobs.fail(short_id, "boom") == QUEUED
+    assert jobs.claim(0)[0] == recovered_id  # short.wav is waiting out its retry delay
+    assert jobs.claim(0) is None
+    stats = jobs.stats()
+    assert stats[QUEUED] == 1 and stats[RUNNING] == 2 and stats["oldest_queued_age"] >= 0
+    # A restart puts interrupted jobs back in the queue, durably
+    jobs.close()
+    jobs = JobQueue(temp_db_path, max_attempts=2, retry_base_delay=0)
+    assert jobs.requeue_running() == 2
+    with jobs._transaction() as conn:
+        conn.execute("UPDATE jobs SET available_at = ?", (time.time(),))
+    claimed = jobs.claim(0)
+    assert claimed[0] == short_id
+    assert jobs.fail(short_id, "boom again") == FAILED
+    jobs.publish_metrics()
+    jobs.close()
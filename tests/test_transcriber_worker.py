@@ -42,4 +42,243 @@ def test_integration_transcriber_worker_real_audio():
         assert last_transcription is not None, "No transcription result returned."
         assert soft_equal(last_transcription, ground_truth), f"Transcription did not match ground truth.\nExpected: {ground_truth}\nGot: {last_transcription}"
     finally:
-        worker.shutdown() 
\ No newline at end of file
+        worker.shutdown() 
+
+def _fake_model():
+    """A stand-in for WhisperModel that returns one segment per call."""
+    model = MagicMock()
+    def transcribe(audio, **kwargs):
+        segment = MagicMock(id=1, start=0.0, end=len(audio) / 16000, text=" hello")
+        info = MagicMock(language="en", language_probability=0.99)
+        return iter([segment]), info
+    model.transcribe.side_effect = transcribe
+    return model
+
+def test_streaming_messages_produce_partial_and_final_results():
+    import numpy as np
+    from src.transcriber.streaming import STREAM_START, STREAM_CHUNK, STREAM_END
+    worker = TranscriberWorker()
+    model = _fake_model()
+    results = []
+    result_queue = MagicMock()
+    result_queue.put.side_effect = results.append
+    event_bus = MagicMock()
+    sample_rate = 16000
+    speech = (np.sin(np.arange(sample_rate * 3) / 5.0) * 8000).astype(np.int16)
+    silence = np.zeros(sample_rate, dtype=np.int16)
+    worker._handle_stream_message(model, {"type": STREAM_START, "stream_id": "s1", "sample_rate": sample_rate}, result_queue, event_bus)
+    for block in (speech, silence, speech):
+        for i in range(0, len(block), 1024):
+            worker._handle_stream_message(model, {"type": STREAM_CHUNK, "stream_id": "s1", "pcm": block[i:i + 1024].tobytes()}, result_queue, event_bus)
+    # The first utterance is transcribed during the pause, before the stream ends, and
+    # reported as an event; only the final result goes on the result queue
+    from src.event_bus.event_bus import EventType
+    partials = [c.args[1] for c in event_bus.publish.call_args_list if c.args[0] == EventType.TRANSCRIPTION_PARTIAL]
+    assert partials and partials[0]["text"] == "hello" and not results
+    worker._handle_stream_message(model, {"type": STREAM_END, "stream_id": "s1", "audio_path": "s1.wav"}, result_queue, event_bus)
+    final = results[-1]
+    assert final["audio_path"] == "s1.wav"
+    assert final["streamed"] is True
+    assert final["text"] == "hello hello"
+    assert final["segments"][1]["start"] > final["segments"][0]["start"]
+    assert "s1" not in worker._sessions
+
+def test_resolve_job_reads_shared_pcm_and_falls_back_to_file():
+    import numpy as np
+    from src.recorder.shared_pcm_buffer import SharedPCMRingBuffer
+    worker = TranscriberWorker()
+    buffer = SharedPCMRingBuffer.create(capacity_frames=16000, channels=1, sample_rate=16000)
+    try:
+        buffer.write((np.ones(1600) * 16384).astype(np.int16).tobytes())
+        audio_path, audio = worker._resolve_job({"audio_path": "a.wav", "pcm": buffer.describe(0, 1600)})
+        assert audio_path == "a.wav"
+        assert audio.dtype == np.float32 and len(audio) == 1600
+        assert abs(audio[0] - 0.5) < 1e-6
+        # Frames that were never written cannot be served from memory
+        assert worker._resolve_job({"audio_path": "b.wav", "pcm": buffer.describe(0, 99999)}) == ("b.wav", "b.wav")
+    finally:
+        for attached in worker._shared_buffers.values():
+            attached.close()
+        buffer.close()
+
+def test_plan_workers_splits_cores():
+    from src.transcriber.worker_pool import plan_workers
+    assert plan_workers(cpu_count=2) == (1, 2)
+    assert plan_workers(cpu_count=16) == (4, 4)
+    assert plan_workers(cpu_count=16, num_workers=2) == (2, 8)
+    assert plan_workers(cpu_count=2, num_workers=8) == (2, 1)
+
+def test_pool_dispatches_shortest_job_first(tmp_path):
+    import wave
+    from src.transcriber.worker_pool import TranscriberPool
+    from src.transcriber.transcriber_worker import WORKER_READY
+    paths = {}
+    for name, seconds in (("long", 3), ("short", 1), ("medium", 2)):
+        paths[name] = str(tmp_path / f"{name}.wav")
+        with wave.open(paths[name], 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b'\x00\x00' * 16000 * seconds)
+    pool = TranscriberPool(num_workers=1, cpu_count=4, transcription_queue=MagicMock())
+    worker_queue = MagicMock()
+    pool._worker_queues = [worker_queue]
+    for name in ("long", "short", "medium"):
+        pool._accept(paths[name])
+    dispatched = []
+    for _ in range(3):
+        pool._accept({"type": WORKER_READY, "worker_id": 0})
+        pool._assign()
+        dispatched.append(worker_queue.put.call_args.args[0])
+    assert [job["audio_path"] if isinstance(job, dict) else job for job in dispatched] == [paths["short"], paths["medium"], paths["long"]]
+    # Jobs dispatched while others are still waiting are flagged for batched decoding
+    assert [isinstance(job, dict) and job.get("batched", False) for job in dispatched] == [True, True, False]
+
+def test_pool_with_job_queue_persists_and_retries_jobs(tmp_path):
+    from src.storage.job_queue import JobQueue, QUEUED, RUNNING, DONE
+    from src.transcriber.worker_pool import TranscriberPool
+    from src.transcriber.transcriber_worker import WORKER_READY
+    db_path = str(tmp_path / 'jobs.db')
+    job_queue = JobQueue(db_path, retry_base_delay=0)
+    pool = TranscriberPool(num_workers=1, cpu_count=4, transcription_queue=MagicMock(), job_queue=job_queue)
+    worker_queue = MagicMock()
+    pool._worker_queues = [worker_queue]
+    pool._accept({"audio_path": "a.wav"})
+    pool._accept({"audio_path": "a.wav"})  # duplicate of a queued job
+    pool._accept({"type": WORKER_READY, "worker_id": 0})
+    pool._assign()
+    job = worker_queue.put.call_args.args[0]
+    assert job["audio_path"] == "a.wav" and job["job_id"] == 1
+    # The worker gives up on the job: it is retried
+    pool._accept({"type": WORKER_READY, "worker_id": 0, "error": "decode failed"})
+    assert job_queue.stats()[QUEUED] == 1
+    pool._assign()
+    assert worker_queue.put.call_count == 2
+    # A finished job stays running until its result has been saved
+    pool._accept({"type": WORKER_READY, "worker_id": 0})
+    assert job_queue.stats()[RUNNING] == 1
+    job_queue.complete(job["job_id"])
+    assert job_queue.stats()[DONE] == 1 and job_queue.depth() == 0
+    # With nothing queued, idle dispatcher passes do not touch the database
+    pool._assign()
+    assert pool._job_queue.publish_metrics(changed_only=True) is not None
+    with patch.object(job_queue, '_transaction') as transaction:
+        for _ in range(5):
+            pool._assign()
+            assert pool._job_queue.publish_metrics(changed_only=True) is None
+        assert transaction.call_count == 0
+    pool._accept({"audio_path": "b.wav"})
+    pool._assign()
+    assert worker_queue.put.call_args.args[0]["audio_path"] == "b.wav"
+    job_queue.close()
+
+def test_pool_pins_stream_to_one_worker():
+    from src.transcriber.worker_pool import TranscriberPool
+    from src.transcriber.transcriber_worker import WORKER_READY
+    from src.transcriber.streaming import STREAM_START, STREAM_CHUNK, STREAM_END
+    pool = TranscriberPool(num_workers=2, cpu_count=8, transcription_queue=MagicMock())
+    queues = [MagicMock(), MagicMock()]
+    pool._worker_queues = queues
+    pool._accept({"type": STREAM_START, "stream_id": "s", "sample_rate": 16000})
+    pool._accept({"type": STREAM_CHUNK, "stream_id": "s", "pcm": b''})
+    pool._accept({"type": WORKER_READY, "worker_id": 1})
+    pool._accept({"type": WORKER_READY, "worker_id": 0})
+    pool._assign()
+    pool._accept({"type": STREAM_END, "stream_id": "s"})
+    assert [c.args[0]["type"] for c in queues[1].put.call_args_list] == [STREAM_START, STREAM_CHUNK, STREAM_END]
+    assert not queues[0].put.called
+    assert "s" not in pool._stream_owners
+
+def test_batched_pipeline_used_on_cpu_for_long_audio():
+    import numpy as np
+    worker = TranscriberWorker(device="cpu", use_batched=True, batch_size=4, batched_min_duration=30.0)
+    worker._batched_model = _fake_model()
+    model = _fake_model()
+    worker._transcribe(model, np.zeros(16000 * 5, dtype=np.float32))
+    assert model.transcribe.called and not worker._batched_model.transcribe.called
+    worker._transcribe(model, np.zeros(16000 * 60, dtype=np.float32))
+    assert worker._batched_model.transcribe.call_args.kwargs["batch_size"] == 4
+    worker._batched_model.transcribe.reset_mock()
+    worker._transcribe(model, np.zeros(16000 * 5, dtype=np.float32), job={"audio_path": "a.wav", "batched": True})
+    assert worker._batched_model.transcribe.called
+
+def test_split_at_silences_cuts_between_speech_regions():
+    from src.transcriber.chunking import split_at_silences
+    speech = [{"start": 0, "end": 10}, {"start": 20, "end": 30}, {"start": 40, "end": 90}, {"start": 100, "end": 110}]
+    assert split_at_silences(speech, 120, 35) == [(0, 35), (35, 95), (95, 120)]
+    assert split_at_silences([], 120, 35) == [(0, 120)]
+
+def test_long_audio_is_decoded_as_parallel_chunks():
+    import threading
+    import time
+    import numpy as np
+    worker = TranscriberWorker(parallel_chunks=3, chunk_seconds=30.0, chunked_min_duration=60.0)
+    model = MagicMock()
+    model.detect_language.return_value = ("de", 0.9, [])
+    active, peak, lock = [0], [0], threading.Lock()
+    def transcribe(audio, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        assert kwargs["language"] == "de"
+        return iter([MagicMock(id=1, start=0.5, end=len(audio) / 16000, text=" chunk")]), None
+    model.transcribe.side_effect = transcribe
+    # Speech every 10 s, with pauses in between
+    speech = [{"start": i * 160000, "end": i * 160000 + 144000} for i in range(9)]
+    with patch('src.transcriber.transcriber_worker.get_speech_timestamps', return_value=speech):
+        segments, info = worker._transcribe(model, np.zeros(16000 * 90, dtype=np.float32))
+    assert model.transcribe.call_count == 3 and peak[0] > 1
+    assert [s["id"] for s in segments] == [1, 2, 3]
+    # Times are on the recording's timeline: chunks start at 0 s and at the 29.5 s / 59.5 s pauses
+    assert [s["start"] for s in segments] == [0.5, 30.0, 60.0]
+    assert segments[-1]["end"] == 90.0
+    assert info.language == "de" and info.language_probability == 0.9
+
+def test_segments_are_published_as_they_are_decoded():
+    import numpy as np
+    from src.event_bus.event_bus import EventType
+    worker = TranscriberWorker()
+    event_bus = MagicMock()
+    published = event_bus.publish.call_args_list
+    def lazy_segments():
+        for i in range(3):
+            # The previous segment was published before this one is decoded
+            assert len(published) == i
+            yield MagicMock(id=i + 1, start=float(i), end=i + 1.0, text=f" part{i}")
+    model = MagicMock()
+    model.transcribe.return_value = (lazy_segments(), MagicMock(language="en", language_probability=0.9))
+    segments, _ = worker._transcribe(model, np.zeros(16000, dtype=np.float32),
+                                     on_segment=worker._segment_publisher(event_bus, "a.wav"))
+    assert [c.args[0] for c in published] == [EventType.TRANSCRIPTION_SEGMENT] * 3
+    assert published[2].args[1] == {"id": 3, "start": 2.0, "end": 3.0, "text": " part2", "audio_path": "a.wav"}
+    assert "".join(s["text"] for s in segments) == " part0 part1 part2"
+
+def test_resolve_model_path_caches_local_directory(tmp_path):
+    from src.transcriber.model_cache import resolve_model_path
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "model.bin").write_bytes(b"")
+    cache_path = str(tmp_path / "models.json")
+    with patch('faster_whisper.utils.download_model', return_value=str(model_dir)) as download:
+        assert resolve_model_path("tiny", cache_path=cache_path) == str(model_dir)
+        assert download.call_args.kwargs == {"local_files_only": True}
+        download.reset_mock()
+        # Second resolution comes from the cache without touching faster-whisper/the hub
+        assert resolve_model_path("tiny", cache_path=cache_path) == str(model_dir)
+        assert not download.called
+
+def test_pool_reports_model_ready_once_per_worker_start():
+    from src.transcriber.worker_pool import TranscriberPool
+    from src.transcriber.transcriber_worker import WORKER_READY
+    from src.utils.metrics import Metrics
+    Metrics().reset()
+    pool = TranscriberPool(num_workers=1, cpu_count=4, transcription_queue=MagicMock())
+    info = {"worker_id": 0, "model": "tiny", "load_seconds": 1.5, "warmup_seconds": 0.25, "startup_seconds": 2.0}
+    pool._accept({"type": WORKER_READY, "worker_id": 0, "model_info": info})
+    pool._idle.clear()
+    pool._accept({"type": WORKER_READY, "worker_id": 0})
+    assert Metrics().get("model_cold_start_s")["count"] == 1
+    assert Metrics().get("model_cold_start_s")["last"] == 2.0